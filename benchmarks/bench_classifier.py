@@ -0,0 +1,83 @@
+"""分类器基准测试
+
+对比原有的线性扫描实现与 FileClassifier 哈希索引：
+    python benchmarks/bench_classifier.py [-n 1000000]
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import FOLDER_MAPPING
+from classifier import FileClassifier
+
+
+def legacy_get_file_category(file_path: Path):
+    """原 utils.get_file_category 的线性实现"""
+    if file_path.suffix.lower() in ['.tmp', '.crdownload', '.part']:
+        return None
+    extension = file_path.suffix.lower()
+    for category, config in FOLDER_MAPPING.items():
+        if not config.get("auto_organize", True):
+            continue
+        if extension in config["extensions"]:
+            return category
+    return None
+
+
+def legacy_get_subfolder(category: str, file_path: Path):
+    """原 utils.get_subfolder 的线性实现"""
+    if category not in FOLDER_MAPPING:
+        return None
+    config = FOLDER_MAPPING[category]
+    if "subfolders" not in config:
+        return None
+    extension = file_path.suffix.lower()
+    for subfolder, extensions in config["subfolders"].items():
+        if not extensions or extension in extensions:
+            return subfolder
+    return None
+
+
+def make_names(count: int, seed: int = 0):
+    """生成合成文件名，包含已知、未知、多段及临时扩展名"""
+    rng = random.Random(seed)
+    known = sorted({ext for config in FOLDER_MAPPING.values() for ext in config["extensions"]})
+    extra = [".unknown", ".dat", ".crdownload", ".part", ".PDF", ".Tar.Gz", ""]
+    pool = known + extra
+    return [f"file_{i}{rng.choice(pool)}" for i in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    names = make_names(args.count)
+    paths = [Path(name) for name in names]
+
+    start = time.perf_counter()
+    for path in paths:
+        category = legacy_get_file_category(path)
+        if category:
+            legacy_get_subfolder(category, path)
+    legacy = time.perf_counter() - start
+
+    classifier = FileClassifier()
+    start = time.perf_counter()
+    for name in names:
+        classifier.classify_name(name)
+    indexed = time.perf_counter() - start
+
+    print(f"文件数: {args.count}")
+    print(f"线性扫描: {legacy:.3f}s ({legacy / args.count * 1e9:.0f} ns/文件)")
+    print(f"哈希索引: {indexed:.3f}s ({indexed / args.count * 1e9:.0f} ns/文件)")
+    print(f"加速比: {legacy / indexed:.1f}x")
+    print(f"歧义扩展名: {classifier.ambiguous}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""清理规则基准测试
+
+对比原 check_cleanup_rules 的逐文件实现与预编译的 CleanupRules：
+    python benchmarks/bench_cleanup_rules.py [-n 500000]
+"""
+import argparse
+import fnmatch
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from config import CLEANUP_CONFIG
+from cleanup_rules import CleanupRules
+
+
+def legacy_check(name: str, size: int, mtime: float):
+    """原 utils.check_cleanup_rules 的逻辑（stat 结果以参数传入）"""
+    for pattern in CLEANUP_CONFIG.get("exclude_patterns", []):
+        if fnmatch.fnmatch(name, pattern):
+            return False, "文件名匹配排除模式"
+    if CLEANUP_CONFIG.get("rules", {}).get("age", {}).get("enabled", False):
+        days = CLEANUP_CONFIG["rules"]["age"].get("days", 30)
+        age = (datetime.now() - datetime.fromtimestamp(mtime)).days
+        if age > days:
+            return True, f"文件超过{days}天未修改"
+    if CLEANUP_CONFIG.get("rules", {}).get("size", {}).get("enabled", False):
+        max_size = CLEANUP_CONFIG["rules"]["size"].get("max_size_mb", 1024)
+        if size / (1024 * 1024) > max_size:
+            return True, f"文件大小超过{max_size}MB"
+    if CLEANUP_CONFIG.get("rules", {}).get("type", {}).get("enabled", False):
+        extensions = CLEANUP_CONFIG["rules"]["type"].get("extensions", [])
+        suffix = Path(name).suffix
+        if suffix.lower() in extensions:
+            return True, f"文件类型{suffix}在清理列表中"
+    return False, "文件不符合清理规则"
+
+
+def make_entries(count: int, seed: int = 0):
+    """生成 (文件名, 大小, 修改时间) 合成数据"""
+    rng = random.Random(seed)
+    now = time.time()
+    exts = [".zip", ".exe", ".pdf", ".tmp", ".mp4", ".7z", ".txt", ".bak"]
+    tags = ["", "", "", "_keep", "_重要"]
+    return [
+        (f"file_{i}{rng.choice(tags)}{rng.choice(exts)}",
+         rng.randint(0, 2 * 1024 ** 3),
+         now - rng.uniform(0, 90 * 86400))
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--count", type=int, default=500_000)
+    args = parser.parse_args()
+
+    entries = make_entries(args.count)
+
+    start = time.perf_counter()
+    legacy = [legacy_check(*entry) for entry in entries]
+    legacy_time = time.perf_counter() - start
+
+    rules = CleanupRules()
+    start = time.perf_counter()
+    single = [rules.evaluate(*entry) for entry in entries]
+    single_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = rules.evaluate_batch(entries)
+    batch_time = time.perf_counter() - start
+
+    expected = [reason if ok else None for ok, reason in legacy]
+    mismatches = sum(1 for a, b in zip(expected, batch) if a != b)
+
+    print(f"文件数: {args.count}")
+    print(f"原实现:   {legacy_time:.3f}s ({legacy_time / args.count * 1e9:.0f} ns/文件)")
+    print(f"逐个判断: {single_time:.3f}s ({single_time / args.count * 1e9:.0f} ns/文件)")
+    print(f"批量判断: {batch_time:.3f}s ({batch_time / args.count * 1e9:.0f} ns/文件)")
+    print(f"结果不一致: {mismatches} 个 (逐个与批量一致: {single == batch})")
+
+
+if __name__ == "__main__":
+    main()
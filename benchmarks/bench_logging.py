@@ -0,0 +1,73 @@
+"""日志开销基准测试
+
+模拟多个工作线程批量移动文件时的日志调用，对比同步写日志与
+QueueHandler/QueueListener 后台批量写日志的每次移动开销：
+    python benchmarks/bench_logging.py [-n 20000] [-w 4]
+"""
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import utils
+
+
+def simulate_moves(count: int):
+    """一次文件移动在 safe_move_file 中产生的日志"""
+    for i in range(count):
+        src = f"C:/Users/me/Downloads/file_{i}.zip"
+        dest = f"C:/Users/me/Downloads/[ZIP] 压缩包/ZIP/file_{i}.zip"
+        logging.info(f"已备份文件(硬链接): {src} -> [BACKUP] 备份/file_{i}.zip")
+        logging.info(f"已移动文件: {src} -> {dest} (方式: rename, 复制 0 字节)")
+        logging.info(f"成功处理文件: {src}")
+
+
+def run(async_mode: bool, count: int, workers: int):
+    utils.setup_logging(async_mode=async_mode)
+    per_worker = count // workers
+    threads = [threading.Thread(target=simulate_moves, args=(per_worker,)) for _ in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    # 异步模式下等待后台线程写完剩余日志
+    start = time.perf_counter()
+    utils._stop_log_listener()
+    drain = time.perf_counter() - start
+    for handler in logging.getLogger().handlers:
+        handler.close()
+    logging.getLogger().handlers.clear()
+    return elapsed, drain, per_worker * workers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-n", "--moves", type=int, default=20000)
+    parser.add_argument("-w", "--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        utils.LOGS_PATH = Path(tmp)
+        # 控制台输出会干扰结果，重定向到空设备
+        with open(Path(tmp) / "console.txt", "w", encoding="utf-8") as console:
+            stderr, sys.stderr = sys.stderr, console
+            try:
+                results = {mode: run(mode, args.moves, args.workers) for mode in (False, True)}
+            finally:
+                sys.stderr = stderr
+
+    for mode, (elapsed, drain, moves) in results.items():
+        name = "异步批量" if mode else "同步"
+        print(f"{name}: 每次移动 {elapsed / moves * 1e6:.1f} us (工作线程耗时 {elapsed:.3f}s, 后台写完 {drain:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
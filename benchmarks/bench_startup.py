@@ -0,0 +1,103 @@
+"""启动导入耗时基准测试
+
+用 python -X importtime 在新进程中导入各入口模块，统计总导入耗时、
+耗时最多的顶层包，以及是否提前导入了较重的可选依赖：
+    python benchmarks/bench_startup.py [-r 5] [-m file_organizer clearboom] [--json startup.json]
+
+--json 输出可以按版本保存，用于跟踪每次发布的冷启动时间。
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 只应在用到时才导入的依赖
+HEAVY_MODULES = ("customtkinter", "pystray", "PIL", "psutil", "win11toast", "send2trash", "win32api")
+
+
+def import_times(module: str):
+    """导入一次模块，返回 (总耗时us, {顶层包: 自身耗时us})"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(ROOT), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()
+        raise RuntimeError(error[-1] if error else f"exit code {proc.returncode}")
+
+    total = None
+    packages = defaultdict(int)
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name.strip()
+        packages[name.split(".")[0]] += int(self_us)
+        if name == module:
+            total = int(cumulative_us)
+    return total, dict(packages)
+
+
+def measure(module: str, repeat: int, top: int):
+    totals = []
+    samples = defaultdict(list)
+    for _ in range(repeat):
+        total, packages = import_times(module)
+        totals.append(total)
+        for name, self_us in packages.items():
+            samples[name].append(self_us)
+    heaviest = sorted(
+        ((name, statistics.median(values)) for name, values in samples.items()),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+    return {
+        "total_us": statistics.median(totals),
+        "min_us": min(totals),
+        "top": dict(heaviest),
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in samples],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("-m", "--modules", nargs="+", default=["file_organizer", "clearboom"])
+    parser.add_argument("-t", "--top", type=int, default=10)
+    parser.add_argument("--json", type=Path, help="把结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    results = {}
+    for module in args.modules:
+        try:
+            result = measure(module, args.repeat, args.top)
+        except RuntimeError as e:
+            print(f"{module}: 导入失败 ({e})")
+            results[module] = {"error": str(e)}
+            continue
+        results[module] = result
+        print(f"{module}: {result['total_us'] / 1000:.1f} ms (中位数, 最快 {result['min_us'] / 1000:.1f} ms)")
+        for name, self_us in result["top"].items():
+            print(f"    {name:<24} {self_us / 1000:8.1f} ms")
+        if result["heavy_loaded"]:
+            print(f"    提前导入的重依赖: {', '.join(result['heavy_loaded'])}")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "repeat": args.repeat,
+            "results": results,
+        }, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from config import FOLDER_MAPPING
+
+# 浏览器下载临时文件扩展名
+TEMP_EXTENSIONS = frozenset([".tmp", ".crdownload", ".part"])
+
+
+class FileClassifier:
+    """扩展名分类索引
+
+    根据FOLDER_MAPPING一次性构建 扩展名 -> (分类, 子文件夹) 的哈希表，
+    一次查找即可同时得到分类和二级分类。支持 .tar.gz 这类多段扩展名（最长匹配优先）。"""
+
+    def __init__(self, folder_mapping: Optional[dict] = None):
+        mapping = FOLDER_MAPPING if folder_mapping is None else folder_mapping
+
+        # 扩展名 -> (分类, 子文件夹)，只包含启用自动整理的分类
+        self._index: Dict[str, Tuple[str, Optional[str]]] = {}
+        # 分类 -> {扩展名: 子文件夹}
+        self._subfolders: Dict[str, Dict[str, str]] = {}
+        # 分类 -> 兜底子文件夹（扩展名列表为空的子文件夹）
+        self._default_subfolder: Dict[str, Optional[str]] = {}
+        # 出现在多个分类中的扩展名 -> [分类...]
+        self.ambiguous: Dict[str, List[str]] = {}
+        # 扩展名最多包含的段数（.tar.gz 为 2）
+        self._max_parts = 1
+
+        owners: Dict[str, List[str]] = {}
+        for category, config in mapping.items():
+            sub_index: Dict[str, str] = {}
+            default = None
+            for subfolder, extensions in config.get("subfolders", {}).items():
+                if not extensions:
+                    # 与get_subfolder一致：空列表匹配所有扩展名，之后的子文件夹不再生效
+                    default = subfolder
+                    break
+                for ext in extensions:
+                    sub_index.setdefault(ext.lower(), subfolder)
+            self._subfolders[category] = sub_index
+            self._default_subfolder[category] = default
+
+            for ext in config["extensions"]:
+                ext = ext.lower()
+                if category not in owners.setdefault(ext, []):
+                    owners[ext].append(category)
+                self._max_parts = max(self._max_parts, ext.count("."))
+                # 按配置顺序，第一个启用的分类优先
+                if config.get("auto_organize", True) and ext not in self._index:
+                    self._index[ext] = (category, sub_index.get(ext, default))
+
+        self.ambiguous = {ext: cats for ext, cats in owners.items() if len(cats) > 1}
+        for ext, cats in self.ambiguous.items():
+            logging.debug(f"扩展名 {ext} 同时属于多个分类 {cats}，使用 {cats[0]}")
+
+    def _candidates(self, name: str):
+        """按从长到短的顺序生成文件名的候选扩展名"""
+        parts = name.lower().split(".")
+        for n in range(min(self._max_parts, len(parts) - 1), 0, -1):
+            yield "." + ".".join(parts[-n:])
+
+    def is_temp_file(self, name: str) -> bool:
+        """是否为浏览器下载临时文件"""
+        dot = name.rfind(".")
+        return dot > 0 and name[dot:].lower() in TEMP_EXTENSIONS
+
+    def extension_of(self, name: str) -> Optional[str]:
+        """返回文件名匹配到的已知扩展名（最长匹配），未知类型返回None"""
+        for ext in self._candidates(name):
+            if ext in self._index:
+                return ext
+        return None
+
+    def classify_name(self, name: str) -> Tuple[Optional[str], Optional[str]]:
+        """根据文件名返回 (分类, 子文件夹)"""
+        lower = name.lower()
+        dot = lower.rfind(".")
+        if dot < 0:
+            return None, None
+        if dot > 0 and lower[dot:] in TEMP_EXTENSIONS:
+            return None, None
+
+        # 多段扩展名优先（.tar.gz 先于 .gz）
+        hit = None
+        start = dot
+        for _ in range(self._max_parts):
+            candidate = self._index.get(lower[start:])
+            if candidate is not None:
+                hit = candidate
+            start = lower.rfind(".", 0, start)
+            if start < 0:
+                break
+        return hit if hit is not None else (None, None)
+
+    def classify(self, file_path: Union[Path, str]) -> Tuple[Optional[str], Optional[str]]:
+        """返回文件的 (分类, 子文件夹)"""
+        return self.classify_name(Path(file_path).name)
+
+    def category(self, file_path: Union[Path, str]) -> Optional[str]:
+        """返回文件分类"""
+        return self.classify(file_path)[0]
+
+    def subfolder(self, category: str, file_path: Union[Path, str]) -> Optional[str]:
+        """返回指定分类下文件的二级分类文件夹名称"""
+        sub_index = self._subfolders.get(category)
+        if sub_index is None:
+            return None
+        for ext in self._candidates(Path(file_path).name):
+            if ext in sub_index:
+                return sub_index[ext]
+        return self._default_subfolder[category]
+
+
+_classifier: Optional[FileClassifier] = None
+
+
+def get_classifier() -> FileClassifier:
+    """获取全局分类器（首次使用时根据配置构建）"""
+    global _classifier
+    if _classifier is None:
+        _classifier = FileClassifier()
+    return _classifier
@@ -0,0 +1,85 @@
+import fnmatch
+import os
+import re
+import time
+from typing import Iterable, List, Optional, Tuple
+from config import CLEANUP_CONFIG
+
+# 与 fnmatch.fnmatch 一致：在不区分大小写的文件系统上忽略大小写
+_CASE_INSENSITIVE = os.path.normcase("A") == "a"
+
+
+class CleanupRules:
+    """预编译的清理规则
+
+    根据 CLEANUP_CONFIG 一次性编译：排除模式合并为一个正则，年龄规则换算成绝对的
+    修改时间截止点，大小规则换算成字节数，类型规则转为扩展名集合。
+    之后每个文件只需一次 stat 结果即可判断，也支持批量判断。"""
+
+    def __init__(self, config: Optional[dict] = None, now: Optional[float] = None):
+        config = CLEANUP_CONFIG if config is None else config
+        rules = config.get("rules", {})
+        now = time.time() if now is None else now
+
+        patterns = config.get("exclude_patterns", [])
+        self.exclude = re.compile(
+            "|".join(f"(?:{fnmatch.translate(p)})" for p in patterns),
+            re.IGNORECASE if _CASE_INSENSITIVE else 0
+        ) if patterns else None
+
+        # 年龄规则: 原先按 (now - mtime).days > days 判断，等价于 mtime <= now - (days + 1) 天
+        age = rules.get("age", {})
+        self.age_days = age.get("days", 30)
+        self.mtime_cutoff = now - (self.age_days + 1) * 86400 if age.get("enabled", False) else None
+
+        size = rules.get("size", {})
+        self.max_size_mb = size.get("max_size_mb", 1024)  # 默认1GB
+        self.size_limit = self.max_size_mb * 1024 * 1024 if size.get("enabled", False) else None
+
+        type_rule = rules.get("type", {})
+        self.extensions = frozenset(
+            ext.lower() for ext in type_rule.get("extensions", [])
+        ) if type_rule.get("enabled", False) else frozenset()
+
+        self._age_reason = f"文件超过{self.age_days}天未修改"
+        self._size_reason = f"文件大小超过{self.max_size_mb}MB"
+
+    def evaluate(self, name: str, size: int, mtime: float) -> Optional[str]:
+        """判断单个文件，需要清理时返回原因，否则返回None"""
+        if self.exclude is not None and self.exclude.match(name):
+            return None
+        if self.mtime_cutoff is not None and mtime <= self.mtime_cutoff:
+            return self._age_reason
+        if self.size_limit is not None and size > self.size_limit:
+            return self._size_reason
+        if self.extensions:
+            suffix = os.path.splitext(name)[1]
+            if suffix.lower() in self.extensions:
+                return f"文件类型{suffix}在清理列表中"
+        return None
+
+    def evaluate_batch(self, entries: Iterable[Tuple[str, int, float]]) -> List[Optional[str]]:
+        """批量判断 (文件名, 大小, 修改时间)，返回与输入一一对应的清理原因（不清理为None）"""
+        exclude = self.exclude.match if self.exclude is not None else None
+        cutoff = self.mtime_cutoff
+        size_limit = self.size_limit
+        extensions = self.extensions
+        age_reason = self._age_reason
+        size_reason = self._size_reason
+        splitext = os.path.splitext
+
+        results: List[Optional[str]] = []
+        append = results.append
+        for name, size, mtime in entries:
+            if exclude is not None and exclude(name):
+                append(None)
+            elif cutoff is not None and mtime <= cutoff:
+                append(age_reason)
+            elif size_limit is not None and size > size_limit:
+                append(size_reason)
+            elif extensions:
+                suffix = splitext(name)[1]
+                append(f"文件类型{suffix}在清理列表中" if suffix.lower() in extensions else None)
+            else:
+                append(None)
+        return results
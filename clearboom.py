@@ -0,0 +1,194 @@
+"""ClearBOOM 命令行入口
+
+用法:
+    python -m clearboom run [--no-gui]      运行整理服务（默认带图形界面）
+    python -m clearboom organize            立即整理下载文件夹中现有的文件后退出
+    python -m clearboom scan                列出符合清理规则的文件
+    python -m clearboom cleanup [--dry-run] 清理符合规则的文件
+
+进度和结果以每行一个 JSON 对象的形式输出到标准输出，日志输出到标准错误。
+无界面模式不会导入任何图形界面模块。
+"""
+import argparse
+import json
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+
+_print_lock = threading.Lock()
+
+def emit(event: str, fields: dict = None) -> None:
+    """输出一行 JSON 事件"""
+    record = {"event": event, "time": round(time.time(), 3)}
+    if fields:
+        record.update(fields)
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    with _print_lock:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
+def _stop_on_signal(stop_event: threading.Event) -> None:
+    """收到 SIGINT/SIGTERM 时设置停止标志"""
+    def handler(signum, frame):
+        stop_event.set()
+    signal.signal(signal.SIGINT, handler)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, handler)
+
+def _counting_reporter(counts: Counter):
+    """转发整理事件并按类型计数"""
+    def reporter(event: str, fields: dict) -> None:
+        counts[event] += 1
+        emit(event, fields)
+    return reporter
+
+def cmd_run(args) -> int:
+    """运行整理服务"""
+    import file_organizer
+    if not args.no_gui:
+        file_organizer.main()
+        return 0
+
+    file_organizer.prepare_environment()
+    organizer = file_organizer.FileOrganizer()
+    organizer.set_reporter(lambda event, fields: emit(event, fields))
+
+    stop_event = threading.Event()
+    _stop_on_signal(stop_event)
+    organizer.start()
+    emit("started", {"downloads": str(file_organizer.DOWNLOADS_PATH)})
+    try:
+        while not stop_event.wait(1):
+            pass
+    finally:
+        organizer.stop()
+        emit("stopped")
+    return 0
+
+def cmd_organize(args) -> int:
+    """立即整理现有文件，处理完后退出"""
+    import file_organizer
+    file_organizer.prepare_environment()
+    # 不等待延迟时间，立即整理；被占用或空间不足的文件只尝试一次，计入失败
+    organizer = file_organizer.FileOrganizer(delay_hours=0, retry=False)
+    counts = Counter()
+    organizer.set_reporter(_counting_reporter(counts))
+
+    organizer.start(watch=False)
+    if not file_organizer.USER_CONFIG["organize_on_startup"]:
+        organizer.scan_existing_files()
+    finished = organizer.wait_idle(args.timeout)
+    organizer.stop()
+
+    emit("summary", {
+        "moved": counts["moved"],
+        "skipped": counts["skipped"],
+        "failed": counts["failed"],
+        "finished": finished,
+    })
+    return 0 if finished else 1
+
+def _scan(stop_event: threading.Event):
+    """扫描清理候选文件并逐个输出"""
+    from utils import iter_cleanup_candidates
+    candidates = []
+    for candidate in iter_cleanup_candidates(stop_event):
+        candidates.append(candidate)
+        emit("candidate", {
+            "path": str(candidate.path),
+            "reason": candidate.reason,
+            "size": candidate.size,
+            "mtime": candidate.mtime,
+        })
+    return candidates
+
+def cmd_scan(args) -> int:
+    """列出符合清理规则的文件"""
+    from utils import setup_logging
+    setup_logging()
+    stop_event = threading.Event()
+    _stop_on_signal(stop_event)
+
+    candidates = _scan(stop_event)
+    emit("summary", {
+        "candidates": len(candidates),
+        "bytes": sum(candidate.size for candidate in candidates),
+        "cancelled": stop_event.is_set(),
+    })
+    return 0
+
+def cmd_cleanup(args) -> int:
+    """清理符合规则的文件"""
+    from config import CLEANUP_CONFIG
+    from utils import setup_logging, run_cleanup
+    setup_logging()
+    stop_event = threading.Event()
+    _stop_on_signal(stop_event)
+
+    if not args.dry_run and CLEANUP_CONFIG["require_confirmation"] and not args.yes:
+        emit("error", {"message": "配置要求确认清理，请使用 --yes 确认或 --dry-run 预览"})
+        return 2
+
+    candidates = _scan(stop_event)
+    if args.dry_run or stop_event.is_set():
+        emit("summary", {
+            "candidates": len(candidates),
+            "bytes": sum(candidate.size for candidate in candidates),
+            "dry_run": args.dry_run,
+            "cancelled": stop_event.is_set(),
+        })
+        return 0
+
+    def progress(current, total, file_path, reason):
+        emit("progress", {"current": current, "total": total, "path": str(file_path)})
+
+    report = run_cleanup(
+        [(candidate.path, candidate.reason) for candidate in candidates],
+        callback=progress,
+        cancel_event=stop_event
+    )
+    for result in report.results:
+        emit("result", {
+            "path": str(result.path),
+            "reason": result.reason,
+            "status": result.status,
+            "message": result.message,
+        })
+    summary = dict(report.stats)
+    summary["cancelled"] = report.cancelled
+    emit("summary", summary)
+    return 0 if summary["failed"] == 0 else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="clearboom", description="ClearBOOM 下载文件夹整理工具")
+    subparsers = parser.add_subparsers(dest="command")
+
+    run_parser = subparsers.add_parser("run", help="运行整理服务")
+    run_parser.add_argument("--no-gui", action="store_true", help="不显示图形界面，在前台运行")
+    run_parser.set_defaults(func=cmd_run)
+
+    organize_parser = subparsers.add_parser("organize", help="立即整理现有文件后退出")
+    organize_parser.add_argument("--timeout", type=float, default=None, help="最长等待时间（秒）")
+    organize_parser.set_defaults(func=cmd_organize)
+
+    scan_parser = subparsers.add_parser("scan", help="列出符合清理规则的文件")
+    scan_parser.set_defaults(func=cmd_scan)
+
+    cleanup_parser = subparsers.add_parser("cleanup", help="清理符合规则的文件")
+    cleanup_parser.add_argument("--dry-run", action="store_true", help="只列出文件，不删除")
+    cleanup_parser.add_argument("--yes", action="store_true", help="确认清理（配置要求确认时必须指定）")
+    cleanup_parser.set_defaults(func=cmd_cleanup)
+    return parser
+
+def main(argv=None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not args.command:
+        # 不带参数时与原来一样启动图形界面
+        args = parser.parse_args(["run"])
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
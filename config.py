@@ -6,6 +6,7 @@ DOWNLOADS_PATH = Path(os.path.expanduser("~/Downloads"))
 SCRIPT_PATH = DOWNLOADS_PATH / "[SCRIPT] 自动整理"
 LOGS_PATH = SCRIPT_PATH / "logs"
 BACKUP_PATH = DOWNLOADS_PATH / "[BACKUP] 备份"
+JOURNAL_PATH = SCRIPT_PATH / "journal.db"  # 文件处理记录（重启后继续延迟计时）
 
 # 文件夹映射配置
 FOLDER_MAPPING = {
@@ -166,23 +167,50 @@ CLEANUP_CONFIG = {
     "cleanup_empty_folders": True,  # 是否清理空文件夹
     "exclude_patterns": [  # 排除的文件名模式
         "*重要*", "*保留*", "*keep*", "*important*"
-    ]
+    ],
+    "scan_workers": 4,  # 并行扫描的线程数（按文件夹分配）
+    "delete_batch_size": 100,  # 每批移入回收站的文件数
+    "delete_workers": 4,  # 并行检查/删除文件的线程数
+    "progress_interval": 0.25  # 进度回调的最小间隔（秒）
 }
 
 # 日志配置
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
 LOG_DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 LOG_ENCODING = "utf-8"
+LOG_BUFFER_SIZE = 1000  # 内存中保留的最近日志条数（供界面显示）
+LOG_ASYNC = False  # 是否在后台线程中写日志文件和控制台（批量写入）
+LOG_BATCH_SIZE = 256  # 后台线程最多累计多少条日志后 flush 一次
 
 # 文件处理配置
 FILE_BATCH_SIZE = 50  # 每批处理的文件数
+CATCHUP_BATCH_SIZE = 100  # 启动补扫每批检查的文件数
+CATCHUP_INTERVAL = 0.1  # 启动补扫每批之间的间隔（秒）
+MOVE_WORKERS = 4  # 移动文件的工作线程数
+MOVES_PER_VOLUME = 4  # 每个磁盘同时进行的最大移动数
 MIN_FREE_SPACE_GB = 10  # 最小所需硬盘空间（GB）
+DISK_SPACE_REFRESH_INTERVAL = 5  # 每个磁盘剩余空间的查询间隔（秒）
+DISK_SPACE_RETRY = 600  # 整批空间不足时，多久后重试（秒）
 FILE_AGE_THRESHOLD = 7  # 文件年龄阈值（天）
+# 移动前的备份策略:
+#   "auto"  - 同一磁盘内直接原子重命名不备份，跨磁盘时优先硬链接备份，不支持时完整复制
+#   "copy"  - 始终完整复制备份
+#   "none"  - 不备份
+MOVE_BACKUP_MODE = "auto"
+# 文件占用检测:
+#   "auto"  - Linux 下扫描 /proc/*/fd，其他平台尝试打开文件
+#   "open"  - 尝试以只读方式打开文件
+#   "proc"  - 扫描 /proc/*/fd（仅 Linux）
+IN_USE_BACKEND = "auto"
+IN_USE_STABLE_WINDOW = 2.0  # 最近多少秒内修改过的文件视为仍在写入（秒）
+IN_USE_CACHE_TTL = 30  # "未占用"检测结果的缓存时间（秒）
+IN_USE_RETRY = 60  # 到期时被占用的文件多久后重试（秒）
 
 # GUI配置
 GUI_TITLE = "ClearBOOM"
 GUI_GEOMETRY = "800x600"
 GUI_REFRESH_INTERVAL = 1000  # 毫秒
+STATS_RECONCILE_INTERVAL = 600  # 文件统计全量校准间隔（秒）
 
 # 状态码
 class Status:
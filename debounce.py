@@ -0,0 +1,115 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, List
+
+
+class Debouncer:
+    """文件事件防抖器
+
+    同一路径的连续事件（创建、修改、重命名）会合并，在静默 quiet_period 秒后
+    只转发一次"已稳定"事件。待处理条目按最后活动时间排序，超过 max_entries
+    时提前转发最早的条目，内存占用有固定上限。"""
+
+    def __init__(self, callback: Callable[[Hashable], None],
+                 quiet_period: float = 2.0, max_entries: int = 10000):
+        self.callback = callback
+        self.quiet_period = quiet_period
+        self.max_entries = max_entries
+        self._pending: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        # 统计计数
+        self.received = 0    # 收到的事件数
+        self.forwarded = 0   # 转发的事件数
+        self.overflowed = 0  # 因超出上限而提前转发的事件数
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._pending
+
+    def start(self) -> None:
+        """启动后台转发线程"""
+        with self._cond:
+            if self._running:
+                return
+            self._running = True
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台线程并丢弃未转发的事件"""
+        with self._cond:
+            self._running = False
+            self._pending.clear()
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def touch(self, key: Hashable) -> None:
+        """记录一次事件，重新开始该路径的静默计时"""
+        overflow = []
+        with self._cond:
+            self.received += 1
+            self._pending[key] = time.monotonic()
+            self._pending.move_to_end(key)
+            while len(self._pending) > self.max_entries:
+                overflow.append(self._pending.popitem(last=False)[0])
+            self.overflowed += len(overflow)
+            self._cond.notify()
+        self._forward(overflow)
+
+    def cancel(self, key: Hashable) -> bool:
+        """取消路径的待转发事件，返回是否存在"""
+        with self._cond:
+            return self._pending.pop(key, None) is not None
+
+    def stats(self) -> Dict[str, int]:
+        """返回事件统计"""
+        with self._cond:
+            return {
+                "received": self.received,
+                "forwarded": self.forwarded,
+                "overflowed": self.overflowed,
+                "pending": len(self._pending),
+            }
+
+    def _forward(self, keys: List[Hashable]) -> None:
+        """转发已稳定的事件（不持有锁）"""
+        for key in keys:
+            try:
+                self.callback(key)
+            except Exception as e:
+                logging.error(f"处理文件事件时出错 {key}: {e}")
+        if keys:
+            with self._cond:
+                self.forwarded += len(keys)
+
+    def _run(self) -> None:
+        """等待最早的条目静默期结束，然后转发所有已稳定的条目"""
+        while True:
+            settled = []
+            with self._cond:
+                if not self._running:
+                    return
+                if not self._pending:
+                    self._cond.wait()
+                    continue
+                now = time.monotonic()
+                for key, last in self._pending.items():
+                    if now - last < self.quiet_period:
+                        break
+                    settled.append(key)
+                if not settled:
+                    oldest = next(iter(self._pending.values()))
+                    self._cond.wait(self.quiet_period - (now - oldest))
+                    continue
+                for key in settled:
+                    del self._pending[key]
+            self._forward(settled)
@@ -0,0 +1,132 @@
+import logging
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class _Volume:
+    """单个磁盘的剩余空间缓存"""
+
+    __slots__ = ("path", "free", "refreshed", "reserved")
+
+    def __init__(self, path: str):
+        self.path = path        # 用于查询剩余空间的路径
+        self.free = 0           # 上次查询到的剩余字节数
+        self.refreshed = None   # 上次查询时间（monotonic）
+        self.reserved = 0       # 正在进行的移动占用的字节数
+
+
+class FreeSpaceTracker:
+    """按磁盘缓存剩余空间
+
+    每个磁盘的剩余空间最多每 refresh_interval 秒查询一次，期间扣除正在进行的
+    移动所预留的字节数，一批上万次移动只需要少量系统调用。
+    剩余空间低于 min_free 字节时不再允许移动。"""
+
+    def __init__(self, min_free: int, refresh_interval: float = 5.0):
+        self.min_free = min_free
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._devices: Dict[str, int] = {}     # 文件夹 -> 设备号
+        self._volumes: Dict[int, _Volume] = {}
+
+        # 统计计数
+        self.refreshes = 0
+
+    def device_of(self, folder: Path) -> Optional[int]:
+        """获取文件夹所在磁盘的设备号，文件夹不存在时使用最近的已存在上级目录"""
+        key = str(folder)
+        device = self._devices.get(key)
+        if device is not None:
+            return device
+        path = Path(folder)
+        while True:
+            try:
+                device = os.stat(path).st_dev
+                break
+            except OSError:
+                if path.parent == path:
+                    return None
+                path = path.parent
+        self._devices[key] = device
+        if device not in self._volumes:
+            self._volumes[device] = _Volume(str(path))
+        return device
+
+    def _volume(self, folder: Path) -> Optional[_Volume]:
+        """获取磁盘记录，缓存过期时重新查询剩余空间（需持有锁）"""
+        device = self.device_of(folder)
+        if device is None:
+            return None
+        volume = self._volumes[device]
+        now = time.monotonic()
+        if volume.refreshed is None or now - volume.refreshed >= self.refresh_interval:
+            volume.free = shutil.disk_usage(volume.path).free
+            volume.refreshed = now
+            self.refreshes += 1
+        return volume
+
+    def available(self, folder: Path) -> int:
+        """可用于移动的字节数（扣除预留和最小剩余空间后）"""
+        with self._lock:
+            volume = self._volume(folder)
+            if volume is None:
+                return 0
+            return volume.free - volume.reserved - self.min_free
+
+    def has_room(self, folder: Path, nbytes: int = 0) -> bool:
+        """检查磁盘是否还能写入 nbytes 字节"""
+        try:
+            return self.available(folder) > nbytes
+        except Exception as e:
+            logging.error(f"检查磁盘空间时出错: {e}")
+            return False
+
+    def reserve(self, folder: Path, nbytes: int) -> bool:
+        """为一次移动预留空间，空间不足时返回False"""
+        try:
+            with self._lock:
+                volume = self._volume(folder)
+                if volume is None or volume.free - volume.reserved - self.min_free <= nbytes:
+                    return False
+                volume.reserved += nbytes
+                return True
+        except Exception as e:
+            logging.error(f"检查磁盘空间时出错: {e}")
+            return False
+
+    def release(self, folder: Path, nbytes: int, consumed: bool = True) -> None:
+        """移动结束后释放预留空间
+        参数:
+            consumed: 数据是否已写入磁盘（成功时从缓存的剩余空间中扣除）"""
+        with self._lock:
+            device = self.device_of(folder)
+            if device is None:
+                return
+            volume = self._volumes[device]
+            volume.reserved = max(0, volume.reserved - nbytes)
+            if consumed:
+                volume.free -= nbytes
+
+    def fits(self, items: Iterable[Tuple[Path, int]]) -> bool:
+        """检查一批 (目标文件夹, 字节数) 能否全部写入"""
+        totals: Dict[int, Tuple[Path, int]] = {}
+        try:
+            with self._lock:
+                for folder, nbytes in items:
+                    device = self.device_of(folder)
+                    if device is None:
+                        return False
+                    first, total = totals.get(device, (folder, 0))
+                    totals[device] = (first, total + nbytes)
+        except Exception as e:
+            logging.error(f"检查磁盘空间时出错: {e}")
+            return False
+        for folder, total in totals.values():
+            if not self.has_room(folder, total):
+                logging.error(f"磁盘空间不足: {folder} 所在磁盘需要 {total / (1024 * 1024):.1f} MB")
+                return False
+        return True
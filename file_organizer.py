@@ -1,16 +1,14 @@
 import os
+import json
 import time
 import logging
 import sys
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, List, Optional, TYPE_CHECKING
 import threading
-import win32event
-import win32api
-import winerror
 import asyncio
-from collections import OrderedDict
+from stat import S_ISDIR
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from concurrent.futures import ThreadPoolExecutor
@@ -19,69 +17,124 @@ from utils import (
     setup_logging,
     safe_move_file,
     get_file_category,
-    is_file_in_use
+    files_in_use,
+    file_stats,
+    disk_space
 )
-from utils_win import add_to_startup, is_in_startup, show_welcome_notification
-from gui import FileOrganizerGUI
+from scheduler import DeadlineScheduler
+from debounce import Debouncer
+from journal import FileJournal, STATE_PENDING, STATE_DONE, STATE_SKIPPED
+from pathpolicy import PathPolicy
+from filecache import ProcessedFileCache
+from platforms import get_platform
 
-# 互斥锁名称
-MUTEX_NAME = "Global\\ClearBOOM_SingleInstance_Mutex"
-# 全局互斥锁对象
-g_mutex = None
+if TYPE_CHECKING:
+    from gui import FileOrganizerGUI
+
+# 补扫检查点在文件处理记录中的名称
+CATCH_UP_CHECKPOINT = "catch_up"
+# 下载文件夹路径策略（根目录只解析一次）
+path_policy = PathPolicy(DOWNLOADS_PATH, PROTECTED_FOLDERS)
 
 class FileHandler(FileSystemEventHandler):
     def __init__(self, organizer):
         self.organizer = organizer
-        self.cooldown = {}  # 文件事件冷却时间
-        self.cooldown_time = 2  # 冷却时间（秒）
+        self.cooldown_time = 2  # 冷却时间（秒），文件停止写入后才转发事件
+        self.max_pending = 10000  # 最多同时跟踪的文件数
+        self.debouncer = Debouncer(
+            lambda file_path: self.organizer.add_file_to_queue(Path(file_path)),
+            quiet_period=self.cooldown_time,
+            max_entries=self.max_pending
+        )
+
+    def start(self):
+        """开始转发文件事件"""
+        self.debouncer.start()
+
+    def stop(self):
+        """停止转发文件事件"""
+        self.debouncer.stop()
 
     def on_created(self, event):
         if not event.is_directory:
+            file_stats.add(Path(event.src_path))
             self._handle_file_event(event.src_path)
 
+    def on_deleted(self, event):
+        if not event.is_directory:
+            file_stats.remove(Path(event.src_path))
+            self.debouncer.cancel(event.src_path)
+            self.organizer.remove_file(Path(event.src_path))
+
     def on_modified(self, event):
         if not event.is_directory:
             self._handle_file_event(event.src_path)
 
-    def _handle_file_event(self, file_path):
-        current_time = time.time()
-        # 检查冷却时间
-        if file_path in self.cooldown and current_time - self.cooldown[file_path] < self.cooldown_time:
+    def on_moved(self, event):
+        if event.is_directory:
             return
-        self.cooldown[file_path] = current_time
-        # 将文件添加到处理队列
-        self.organizer.add_file_to_queue(Path(file_path))
+        # 浏览器下载完成时会把 .crdownload/.part 重命名为最终文件名
+        self.debouncer.cancel(event.src_path)
+        file_stats.remove(Path(event.src_path))
+        if Path(event.dest_path).parent == Path(DOWNLOADS_PATH):
+            file_stats.add(Path(event.dest_path))
+        self.organizer.rename_file(Path(event.src_path), Path(event.dest_path))
+
+    def _handle_file_event(self, file_path):
+        # 合并连续事件，文件稳定后再添加到处理队列
+        self.debouncer.touch(file_path)
 
 class FileOrganizer:
-    def __init__(self):
+    def __init__(self, delay_hours: float = 3, retry: bool = True):
+        """参数:
+            delay_hours: 文件出现后延迟多久再整理
+            retry: 被占用或空间不足的文件是否稍后重试（为False时只尝试一次，用于一次性整理）"""
         self.running = False
         self.initialize_folders()
-        self.gui: Optional[FileOrganizerGUI] = None
+        self.gui: Optional["FileOrganizerGUI"] = None
+        self.reporter: Optional[Callable[[str, dict], None]] = None
         
-        # 使用OrderedDict实现LRU缓存
+        # 已处理文件缓存（按文件身份，7天过期）
         self.cache_size = 10000  # 最大缓存条目数
-        self.processed_files = OrderedDict()
+        self.processed_files = ProcessedFileCache(max_entries=self.cache_size)
         
-        # 创建线程池
-        self.executor = ThreadPoolExecutor(max_workers=4)
+        # 线程池、事件循环和处理队列在start()中创建
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.process_queue: Optional[asyncio.Queue] = None
+        self.main_task: Optional[asyncio.Task] = None
+        self.loop_ready = threading.Event()
+        self.loop_thread: Optional[threading.Thread] = None
+        self.volume_limits = {}  # {磁盘设备号: asyncio.Semaphore}
+        self.in_flight = set()  # 正在移动的文件
+        self.cleanup_interval = 3600  # 定期清理间隔（秒）
         
-        # 创建处理队列
-        self.process_queue = asyncio.Queue()
+        # 创建延迟处理调度器（按到期时间排序的最小堆）
+        self.delay_hours = delay_hours  # 默认延迟3小时处理
+        self.retry = retry
+        self.delayed_files = DeadlineScheduler(self._on_files_due)
+        self.due_files = set()  # 已到期、等待整理的文件
         
-        # 创建延迟处理队列
-        self.delayed_files = {}  # {file_path: created_time}
-        self.delay_hours = 3  # 延迟3小时处理
+        # 启动补扫（后台线程，可从检查点继续）
+        self.catch_up_thread: Optional[threading.Thread] = None
+        self.catch_up_stop = threading.Event()
+        self.catch_up_seen = set()  # 补扫期间文件监控已转发的文件
+        self.catching_up = False
         
         # 创建文件系统监控
         self.event_handler = FileHandler(self)
-        self.observer = Observer()
-        self.observer.schedule(self.event_handler, str(DOWNLOADS_PATH), recursive=False)
+        self.observer: Optional[Observer] = None
         
         setup_logging()
         
+        # 加载持久化的文件处理记录，恢复延迟计时
+        self.journal = FileJournal(JOURNAL_PATH)
+        self._restore_from_journal()
+        
         # 检查是否是首次运行
-        if not is_in_startup():
-            add_to_startup()
+        platform = get_platform()
+        if not platform.is_in_startup():
+            platform.add_to_startup()
 
     def initialize_folders(self):
         """初始化所有必需的文件夹"""
@@ -104,48 +157,106 @@ class FileOrganizer:
             logging.error(f"创建文件夹时出错: {e}")
             raise
 
-    def set_gui(self, gui: FileOrganizerGUI):
+    def _restore_from_journal(self):
+        """根据文件处理记录恢复延迟队列（不访问磁盘）
+        已跳过的文件不预先加入缓存，发现文件时再与记录中的大小和修改时间比较"""
+        pending = 0
+        skipped = 0
+        for entry in self.journal:
+            if entry.state == STATE_PENDING:
+                self.delayed_files.schedule(entry.path, entry.first_seen + self.delay_hours * 3600)
+                pending += 1
+            elif entry.state == STATE_SKIPPED:
+                skipped += 1
+        logging.info(f"已恢复 {pending} 个延迟处理文件, {skipped} 个已跳过文件")
+
+    def set_gui(self, gui: "FileOrganizerGUI"):
         """设置GUI引用"""
         self.gui = gui
 
+    def set_reporter(self, reporter: Callable[[str, dict], None]):
+        """设置处理事件回调 reporter(事件名, 字段)，供无界面模式输出进度"""
+        self.reporter = reporter
+
+    def _report(self, event: str, **fields):
+        """发送处理事件"""
+        if self.reporter:
+            try:
+                self.reporter(event, fields)
+            except Exception as e:
+                logging.error(f"输出处理事件时出错: {e}")
+
     def update_status(self, message: str):
         """更新GUI状态"""
         if self.gui:
             self.gui.update_status(message)
+        self._report("status", message=message)
 
     def add_file_to_queue(self, file_path: Path):
-        """添加文件到处理队列"""
-        if self._should_process_file(file_path):
-            asyncio.run_coroutine_threadsafe(
-                self.process_queue.put(file_path),
-                self.loop
-            )
+        """添加文件到处理队列（由文件监控调用）"""
+        if self.catching_up:
+            # 记录监控已转发的文件，补扫时跳过
+            self.catch_up_seen.add(str(file_path))
+        self._enqueue(file_path)
+
+    def _enqueue(self, file_path: Path) -> bool:
+        """检查文件并放入处理队列，返回是否已加入队列"""
+        if not self.loop_ready.is_set():
+            return False
+        if not self._should_process_file(file_path):
+            return False
+        self.loop.call_soon_threadsafe(self.process_queue.put_nowait, file_path)
+        return True
+
+    def rename_file(self, src_path: Path, dest_path: Path):
+        """文件被重命名：取消旧路径的等待，并立即将新路径加入队列"""
+        if not self.loop_ready.is_set():
+            return
+        self.loop.call_soon_threadsafe(self._forget_file, str(src_path))
+        # 只处理仍在下载文件夹根目录中的文件
+        if dest_path.parent == Path(DOWNLOADS_PATH):
+            self.add_file_to_queue(dest_path)
+
+    def remove_file(self, file_path: Path):
+        """文件已被删除：取消等待并删除处理记录"""
+        if self.loop_ready.is_set():
+            self.loop.call_soon_threadsafe(self._forget_file, str(file_path))
+        else:
+            self.journal.forget(str(file_path))
+
+    def _forget_file(self, key: str):
+        """从延迟队列和处理记录中移除文件"""
+        self.delayed_files.cancel(key)
+        self.due_files.discard(key)
+        self.journal.forget(key)
 
     def _should_process_file(self, file_path: Path) -> bool:
         """判断文件是否需要处理"""
         try:
-            # 如果是文件夹或不存在，跳过
-            if not file_path.exists() or file_path.is_dir():
+            # 正在等待的文件无需访问磁盘
+            key = str(file_path)
+            if key in self.delayed_files:
                 return False
             
-            # 检查文件是否已在缓存中
-            if str(file_path) in self.processed_files:
+            # 如果是文件夹或不存在，跳过
+            try:
+                st = file_path.stat()
+            except OSError:
+                return False
+            if S_ISDIR(st.st_mode):
                 return False
             
-            # 检查文件名是否在保护列表中
-            if file_path.name in PROTECTED_FOLDERS:
+            # 已处理过的文件（按文件身份判断）
+            if self._is_processed(file_path, st):
                 return False
             
-            # 检查父目录是否在保护列表中
-            if any(parent.name in PROTECTED_FOLDERS for parent in file_path.parents):
+            # 检查文件名及其上级文件夹是否在保护列表中
+            if path_policy.is_protected(file_path):
                 return False
             
             # 检查文件大小
-            try:
-                if file_path.stat().st_size > 1024 * 1024 * 1024:  # 1GB
-                    logging.warning(f"文件过大，跳过处理: {file_path}")
-                    return False
-            except Exception:
+            if st.st_size > 1024 * 1024 * 1024:  # 1GB
+                logging.warning(f"文件过大，跳过处理: {file_path}")
                 return False
                 
             return True
@@ -162,24 +273,36 @@ class FileOrganizer:
                 return False
             
             # 检查文件是否需要延迟处理
-            current_time = time.time()
-            if str(file_path) not in self.delayed_files:
-                self.delayed_files[str(file_path)] = current_time
+            key = str(file_path)
+            if key in self.in_flight:
+                return False  # 正在移动中
+            if key in self.delayed_files:
+                return False  # 还未到处理时间
+            if key not in self.due_files:
+                first_seen = time.time()
+                stat = file_path.stat()
+                self.journal.record(key, STATE_PENDING, first_seen, stat.st_size, stat.st_mtime)
+                due = first_seen + self.delay_hours * 3600
+                self.delayed_files.schedule(key, due)
                 logging.info(f"文件已加入延迟处理队列: {file_path}")
+                self._report("delayed", path=key, due=due)
                 return True
             
-            # 检查是否达到延迟时间
-            created_time = self.delayed_files[str(file_path)]
-            if current_time - created_time < self.delay_hours * 3600:  # 3小时
-                return False  # 还未到处理时间
-            
-            # 移除出延迟队列
-            self.delayed_files.pop(str(file_path))
+            # 移除出到期集合
+            self.due_files.discard(key)
+            try:
+                st = file_path.stat()
+            except FileNotFoundError:
+                logging.info(f"文件已不存在，跳过: {file_path}")
+                self.journal.forget(key)
+                return False
             
             category = get_file_category(file_path)
             if not category:
                 logging.info(f"跳过未知类型文件: {file_path}")
-                self._add_to_cache(str(file_path))
+                self._add_to_cache(st, "")
+                self.journal.set_state(key, STATE_SKIPPED)
+                self._report("skipped", path=key, reason="unknown_type")
                 return False
 
             dest_folder = DOWNLOADS_PATH / category
@@ -188,18 +311,30 @@ class FileOrganizer:
                 logging.error(f"目标文件夹路径不安全: {dest_folder}")
                 return False
             
-            # 在线程池中执行文件移动操作
-            result = await self.loop.run_in_executor(
-                self.executor,
-                safe_move_file,
-                file_path,
-                dest_folder
-            )
+            # 在线程池中执行文件移动操作（按目标磁盘限制并发数）
+            self.in_flight.add(key)
+            try:
+                async with self._volume_limit(dest_folder):
+                    result, move_report = await self.loop.run_in_executor(
+                        self.executor,
+                        safe_move_file,
+                        file_path,
+                        dest_folder
+                    )
+            finally:
+                self.in_flight.discard(key)
 
             if result == Status.SUCCESS:
-                self._add_to_cache(str(file_path))
+                self._add_to_cache(st, category)
+                self.journal.set_state(key, STATE_DONE)
+                self._report("moved", path=key, dest=str(move_report.dest),
+                             method=move_report.method, bytes_copied=move_report.bytes_copied)
                 return True
-            elif result == Status.FILE_IN_USE:
+
+            # 移动失败，下次发现时重新开始计时
+            self.journal.forget(key)
+            self._report("failed", path=key, status=result)
+            if result == Status.FILE_IN_USE:
                 logging.warning(f"文件被占用: {file_path}")
             elif result == Status.INSUFFICIENT_SPACE:
                 logging.error("磁盘空间不足")
@@ -213,156 +348,363 @@ class FileOrganizer:
 
         return False
 
-    def _add_to_cache(self, file_path: str):
-        """添加文件到LRU缓存"""
-        self.processed_files[file_path] = time.time()
-        if len(self.processed_files) > self.cache_size:
-            self.processed_files.popitem(last=False)
+    def _batch_fits(self, due: List[Path]) -> bool:
+        """检查一批到期文件移动到分类文件夹后，目标磁盘空间是否足够"""
+        source_device = disk_space.device_of(DOWNLOADS_PATH)
+        items = []
+        for file_path in due:
+            category = get_file_category(file_path)
+            if not category:
+                continue
+            dest_folder = DOWNLOADS_PATH / category
+            # 同一磁盘内重命名不占用额外空间，但仍要求保留最小剩余空间
+            if disk_space.device_of(dest_folder) == source_device:
+                items.append((dest_folder, 0))
+                continue
+            entry = self.journal.get(str(file_path))
+            items.append((dest_folder, entry.size if entry else 0))
+        return disk_space.fits(items)
+
+    def _volume_limit(self, folder: Path) -> asyncio.Semaphore:
+        """获取目标文件夹所在磁盘的并发限制"""
+        try:
+            device = os.stat(folder).st_dev
+        except OSError:
+            device = None
+        if device not in self.volume_limits:
+            self.volume_limits[device] = asyncio.Semaphore(MOVES_PER_VOLUME)
+        return self.volume_limits[device]
+
+    def _on_files_due(self, keys: List[str]):
+        """延迟时间已到，将文件重新放入处理队列"""
+        for key in keys:
+            self.due_files.add(key)
+            self.process_queue.put_nowait(Path(key))
+
+    def _add_to_cache(self, st: os.stat_result, category: str):
+        """添加文件到已处理缓存，同时记录处理时的分类（未知类型为空字符串）"""
+        self.processed_files.add(st, category)
+
+    def _is_processed(self, file_path: Path, st: os.stat_result) -> bool:
+        """文件是否已处理过：先查缓存，再查记录中已跳过且未变化的文件
+        按当前文件名分类，重命名后分类改变的文件（如补上扩展名）视为新文件"""
+        category = get_file_category(file_path) or ""
+        if self.processed_files.contains(st, category):
+            return True
+        entry = self.journal.get(str(file_path))
+        if (not category and entry is not None and entry.state == STATE_SKIPPED
+                and entry.size == st.st_size and entry.mtime == st.st_mtime):
+            self.processed_files.add(st, category)
+            return True
+        return False
 
     async def organize_files(self):
         """整理文件的主循环"""
+        # 队列和信号量必须在使用它们的事件循环中创建
+        self.process_queue = asyncio.Queue()
+        self.volume_limits = {}
+        # 上次停止时已到期但未处理的文件重新入队
+        for key in self.due_files:
+            self.process_queue.put_nowait(Path(key))
+        self.loop_ready.set()
+
+        tasks = [
+            asyncio.ensure_future(self.delayed_files.run()),
+            asyncio.ensure_future(self._cleanup_loop()),
+        ]
+        try:
+            await self._organize_loop()
+        except asyncio.CancelledError:
+            logging.info("整理循环已停止")
+        finally:
+            self.loop_ready.clear()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _organize_loop(self):
+        """处理队列中的文件，队列为空时阻塞等待"""
         while self.running:
             try:
-                # 处理队列中的文件
-                while not self.process_queue.empty():
-                    file_path = await self.process_queue.get()
-                    if await self.process_file(file_path):
-                        logging.info(f"成功处理文件: {file_path}")
-                    else:
-                        logging.info(f"跳过文件: {file_path}")
-                    self.process_queue.task_done()
-                
-                # 定期清理
-                await self.periodic_cleanup()
-                
                 # 等待新的文件
-                await asyncio.sleep(1)
-
+                batch = [await self.process_queue.get()]
+                # 取出已排队的文件，凑成一批
+                while len(batch) < FILE_BATCH_SIZE and not self.process_queue.empty():
+                    batch.append(self.process_queue.get_nowait())
+                await self.process_batch(batch)
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logging.error(f"整理文件时出错: {e}")
                 self.update_status(f"整理出错: {e}")
                 await asyncio.sleep(5)
 
+    async def _cleanup_loop(self):
+        """定时执行定期清理任务"""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            await self.periodic_cleanup()
+
+    async def process_batch(self, batch: List[Path]):
+        """并发处理一批文件"""
+        # 到期的文件整批检测一次占用，之后逐个移动时命中检测缓存
+        due = [file_path for file_path in batch if str(file_path) in self.due_files]
+        if due and not await self.loop.run_in_executor(self.executor, self._batch_fits, due):
+            # 空间不足时整批推迟，而不是移动到一半失败
+            batch = self._postpone(batch, due, DISK_SPACE_RETRY, Status.INSUFFICIENT_SPACE)
+        elif due:
+            busy = await self.loop.run_in_executor(self.executor, files_in_use, due)
+            if busy:
+                # 被占用的文件保留处理记录，稍后重试，不进入移动流程
+                batch = self._postpone(batch, [file_path for file_path in due if file_path in busy],
+                                       IN_USE_RETRY, Status.FILE_IN_USE)
+
+        results = await asyncio.gather(
+            *(self.process_file(file_path) for file_path in batch),
+            return_exceptions=True
+        )
+        for file_path, result in zip(batch, results):
+            if isinstance(result, Exception):
+                logging.error(f"处理文件时出错 {file_path}: {result}")
+            elif result:
+                logging.info(f"成功处理文件: {file_path}")
+            else:
+                logging.info(f"跳过文件: {file_path}")
+            self.process_queue.task_done()
+
+    def _postpone(self, batch: List[Path], files: List[Path], delay: float, status: int) -> List[Path]:
+        """把到期文件重新放回延迟队列，返回批次中剩余的文件
+        不重试时（一次性整理）直接按失败处理"""
+        retry_at = time.time() + delay
+        for file_path in files:
+            key = str(file_path)
+            self.due_files.discard(key)
+            if self.retry:
+                self.delayed_files.schedule(key, retry_at)
+            else:
+                self.journal.forget(key)
+                self._report("failed", path=key, status=status)
+            self.process_queue.task_done()
+        reason = "被占用" if status == Status.FILE_IN_USE else "因磁盘空间不足无法移动"
+        if self.retry:
+            logging.warning(f"{len(files)} 个文件{reason}，推迟 {delay} 秒后重试")
+        else:
+            logging.warning(f"{len(files)} 个文件{reason}，已跳过")
+        postponed = set(files)
+        return [file_path for file_path in batch if file_path not in postponed]
+
     async def periodic_cleanup(self):
         """定期清理任务"""
         try:
-            # 每小时执行一次
-            current_time = time.time()
-            if not hasattr(self, 'last_cleanup_time') or \
-               current_time - self.last_cleanup_time > 3600:
-                
-                # 清理过期的缓存记录
-                expired_time = current_time - 7 * 24 * 3600
-                self.processed_files = OrderedDict(
-                    (k, v) for k, v in self.processed_files.items()
-                    if v > expired_time and os.path.exists(k)
-                )
-                
-                # 清理延迟队列中已不存在的文件
-                self.delayed_files = {
-                    k: v for k, v in self.delayed_files.items()
-                    if os.path.exists(k)
-                }
-                
-                self.last_cleanup_time = current_time
+            # 丢弃过期的缓存记录（按时间桶整体丢弃，不访问磁盘）
+            self.processed_files.expire()
+            logging.debug(f"已处理文件缓存: {self.processed_files.stats()}")
+            
+            # 清理过期的文件处理记录
+            self.journal.prune(7 * 24 * 3600)
                 
         except Exception as e:
             logging.error(f"定期清理任务出错: {e}")
 
+    def start_catch_up(self):
+        """在后台线程中补扫现有文件"""
+        self.catch_up_stop.clear()
+        self.catch_up_seen = set()
+        self.catching_up = True
+        self.catch_up_thread = threading.Thread(target=self.scan_existing_files, daemon=True)
+        self.catch_up_thread.start()
+
     def scan_existing_files(self):
-        """扫描现有文件"""
+        """扫描现有文件
+
+        分批检查下载文件夹，每批之间暂停 CATCHUP_INTERVAL 秒，处理队列积压时等待。
+        已完成的阶段作为检查点保存在文件处理记录中，中途退出后下次启动不再重复
+        整理[TEMP]文件夹。文件监控已转发或正在等待稳定的文件不会重复加入队列，
+        上次启动时已在等待的文件由 _should_process_file 直接跳过，不访问磁盘。"""
+        self.catching_up = True
         try:
-            logging.info("开始扫描现有文件...")
-            
-            # 先重新整理[TEMP]待清理文件夹
-            from utils import reorganize_temp_folder
-            reorganize_temp_folder()
-            
+            checkpoint = self._load_checkpoint()
+            if checkpoint is None:
+                logging.info("开始扫描现有文件...")
+                checkpoint = {"stage": "temp"}
+            else:
+                logging.info(f"从检查点继续扫描现有文件: {checkpoint['stage']}")
+
+            if checkpoint["stage"] == "temp":
+                self._save_checkpoint(checkpoint)
+                # 先重新整理[TEMP]待清理文件夹
+                from utils import reorganize_temp_folder
+                reorganize_temp_folder(self.catch_up_stop)
+                if self.catch_up_stop.is_set():
+                    return
+                checkpoint["stage"] = "files"
+                self._save_checkpoint(checkpoint)
+
             # 扫描下载文件夹中的文件
+            names = os.listdir(DOWNLOADS_PATH)
             count = 0
-            for file_path in Path(DOWNLOADS_PATH).iterdir():
-                if self._should_process_file(file_path):
-                    self.add_file_to_queue(file_path)
-                    count += 1
+            for start in range(0, len(names), CATCHUP_BATCH_SIZE):
+                if self.catch_up_stop.is_set():
+                    logging.info("扫描已中断，下次启动时继续")
+                    return
+                for name in names[start:start + CATCHUP_BATCH_SIZE]:
+                    file_path = DOWNLOADS_PATH / name
+                    key = str(file_path)
+                    # 文件监控已经转发或正在等待稳定的文件
+                    if key in self.catch_up_seen or key in self.event_handler.debouncer:
+                        continue
+                    if self._enqueue(file_path):
+                        count += 1
+                self._throttle_catch_up()
+
+            self._save_checkpoint(None)
             logging.info(f"扫描完成，发现 {count} 个待处理文件")
         except Exception as e:
             logging.error(f"扫描现有文件时出错: {e}")
-
-    def start(self):
-        """开始整理"""
+        finally:
+            self.catching_up = False
+            self.catch_up_seen = set()
+
+    def _load_checkpoint(self) -> Optional[dict]:
+        """读取补扫检查点"""
+        value = self.journal.get_meta(CATCH_UP_CHECKPOINT)
+        if not value:
+            return None
+        try:
+            checkpoint = json.loads(value)
+        except ValueError:
+            return None
+        return checkpoint if checkpoint.get("stage") in ("temp", "files") else None
+
+    def _save_checkpoint(self, checkpoint: Optional[dict]):
+        """保存补扫检查点，None表示扫描已完成"""
+        self.journal.set_meta(
+            CATCH_UP_CHECKPOINT,
+            json.dumps(checkpoint, ensure_ascii=False) if checkpoint is not None else None
+        )
+
+    def _throttle_catch_up(self):
+        """补扫限速：每批之间暂停，处理队列积压时继续等待"""
+        self.catch_up_stop.wait(CATCHUP_INTERVAL)
+        while (not self.catch_up_stop.is_set() and self.process_queue is not None
+               and self.process_queue.qsize() > FILE_BATCH_SIZE * 4):
+            self.catch_up_stop.wait(CATCHUP_INTERVAL)
+
+    def start(self, watch: bool = True):
+        """开始整理
+        参数:
+            watch: 是否启动文件系统监控（为False时只处理启动时扫描到的文件）"""
         if not self.running:
             self.running = True
+            self.executor = ThreadPoolExecutor(max_workers=MOVE_WORKERS)
             # 创建事件循环
             self.loop = asyncio.new_event_loop()
             # 在新线程中运行事件循环
-            threading.Thread(target=self._run_event_loop, daemon=True).start()
+            self.loop_thread = threading.Thread(target=self._run_event_loop, daemon=True)
+            self.loop_thread.start()
             
-            # 等待事件循环启动
-            time.sleep(0.1)
+            # 等待事件循环和处理队列就绪
+            self.loop_ready.wait(timeout=5)
             
-            # 先扫描现有文件
-            if USER_CONFIG["organize_on_startup"]:
-                self.scan_existing_files()
+            # 先启动文件系统监控，补扫期间的新文件不会丢失
+            if watch:
+                self.event_handler.start()
+                self.observer = Observer()
+                self.observer.schedule(self.event_handler, str(DOWNLOADS_PATH), recursive=False)
+                self.observer.start()
             
-            # 启动文件系统监控
-            self.observer.start()
+            # 在后台补扫现有文件
+            if USER_CONFIG["organize_on_startup"]:
+                self.start_catch_up()
             
-            logging.info("文件整理服务已启动")
+            if watch:
+                logging.info("文件整理服务已启动")
+            else:
+                logging.info("文件整理服务已启动（不监控新文件）")
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """等待队列中和延迟中的文件全部处理完，超时返回False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        if self.catch_up_thread:
+            self.catch_up_thread.join(timeout)
+            if self.catch_up_thread.is_alive():
+                return False
+            if deadline is not None:
+                timeout = max(0, deadline - time.monotonic())
+        if not self.loop_ready.is_set():
+            return True
+        future = asyncio.run_coroutine_threadsafe(self._wait_idle(), self.loop)
+        try:
+            future.result(timeout)
+            return True
+        except Exception:
+            future.cancel()
+            return False
+
+    async def _wait_idle(self):
+        """处理队列为空且没有等待中的文件时返回"""
+        while True:
+            await self.process_queue.join()
+            if not len(self.delayed_files) and not self.due_files and not self.in_flight:
+                return
+            await asyncio.sleep(0.1)
 
     def _run_event_loop(self):
         """运行事件循环"""
         asyncio.set_event_loop(self.loop)
-        self.loop.run_until_complete(self.organize_files())
+        try:
+            self.main_task = self.loop.create_task(self.organize_files())
+            self.loop.run_until_complete(self.main_task)
+        finally:
+            self.loop.close()
 
     def stop(self):
         """停止整理"""
+        if not self.running:
+            return
         self.running = False
-        self.observer.stop()
-        self.observer.join()
-        self.executor.shutdown(wait=False)
-        if hasattr(self, 'loop'):
-            self.loop.stop()
+        # 停止补扫，进度保留在检查点中
+        self.catch_up_stop.set()
+        if self.catch_up_thread:
+            self.catch_up_thread.join(timeout=5)
+            self.catch_up_thread = None
+        if self.observer:
+            self.observer.stop()
+            self.observer.join()
+            self.observer = None
+        self.event_handler.stop()
+        # 取消主任务，等待事件循环线程退出
+        if self.loop and self.main_task and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.main_task.cancel)
+        if self.loop_thread:
+            self.loop_thread.join(timeout=5)
+            self.loop_thread = None
+        if self.executor:
+            self.executor.shutdown(wait=False)
+            self.executor = None
 
 def check_running_instance() -> bool:
     """检查是否已有实例在运行"""
-    global g_mutex
-    try:
-        # 尝试创建一个命名互斥锁
-        g_mutex = win32event.CreateMutex(None, True, MUTEX_NAME)
-        last_error = win32api.GetLastError()
-        
-        # 如果互斥锁已存在，说明已有实例在运行
-        if last_error == winerror.ERROR_ALREADY_EXISTS:
-            # 关闭我们的mutex句柄,因为我们不需要它
-            if g_mutex:
-                win32api.CloseHandle(g_mutex)
-                g_mutex = None
-            # 显示通知
-            show_welcome_notification(
-                on_click_callback=None,
-                title="ClearBOOM 已在运行",
-                message="程序已经在运行中，请检查系统托盘",
-                sound="ms-winsoundevent:Notification.Default"
-            )
-            return True
-            
-        return False
-        
-    except Exception as e:
-        logging.error(f"检查实例时出错: {e}")
-        if g_mutex:
-            win32api.CloseHandle(g_mutex)
-            g_mutex = None
+    platform = get_platform()
+    if platform.acquire_instance_lock():
         return False
+    # 显示通知
+    platform.notify(
+        title="ClearBOOM 已在运行",
+        message="程序已经在运行中，请检查系统托盘",
+        sound="ms-winsoundevent:Notification.Default"
+    )
+    return True
 
 def verify_downloads_path() -> bool:
     """验证下载文件夹路径是否正确"""
     try:
         # 获取系统下载文件夹路径
-        import winreg
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, 
-            r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
-            system_downloads = Path(winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0])
+        system_downloads = get_platform().downloads_path()
+        if system_downloads is None:
+            logging.error("无法获取系统下载文件夹路径")
+            return False
         
         # 规范化路径进行比较
         downloads_path = Path(DOWNLOADS_PATH).resolve()
@@ -383,54 +725,49 @@ def verify_downloads_path() -> bool:
 
 def is_safe_path(file_path: Path) -> bool:
     """检查文件路径是否安全(在下载文件夹内)"""
-    try:
-        # 规范化路径
-        file_path = file_path.resolve()
-        downloads_path = Path(DOWNLOADS_PATH).resolve()
+    return path_policy.contains(file_path)
+
+def prepare_environment():
+    """启动前检查：验证下载文件夹路径、单实例、创建并验证必要的目录，失败时退出程序"""
+    # 验证下载文件夹路径
+    if not verify_downloads_path():
+        logging.error("下载文件夹路径验证失败,程序退出")
+        get_platform().notify(
+            title="ClearBOOM 启动失败",
+            message="下载文件夹路径验证失败,请检查配置",
+            sound="ms-winsoundevent:Notification.Default"
+        )
+        sys.exit(1)
         
-        # 检查文件路径是否在下载文件夹内
-        return str(file_path).startswith(str(downloads_path))
-    except Exception as e:
-        logging.error(f"检查路径安全性时出错: {e}")
-        return False
+    # 检查是否已有实例在运行
+    if check_running_instance():
+        logging.info("程序已在运行")
+        sys.exit(0)
+
+    # 创建必要的目录
+    for folder in FOLDER_MAPPING.keys():
+        folder_path = DOWNLOADS_PATH / folder
+        # 验证文件夹路径安全性
+        if not is_safe_path(folder_path):
+            logging.error(f"分类文件夹路径不安全: {folder_path}")
+            sys.exit(1)
+        folder_path.mkdir(exist_ok=True)
+        
+    # 验证备份和日志路径
+    if not is_safe_path(BACKUP_PATH) or not is_safe_path(LOGS_PATH):
+        logging.error("备份或日志文件夹路径不安全")
+        sys.exit(1)
+        
+    BACKUP_PATH.mkdir(exist_ok=True)
+    LOGS_PATH.mkdir(exist_ok=True)
 
 def main():
     """主函数"""
     try:
-        # 验证下载文件夹路径
-        if not verify_downloads_path():
-            logging.error("下载文件夹路径验证失败,程序退出")
-            show_welcome_notification(
-                on_click_callback=None,
-                title="ClearBOOM 启动失败",
-                message="下载文件夹路径验证失败,请检查配置",
-                sound="ms-winsoundevent:Notification.Default"
-            )
-            sys.exit(1)
-            
-        # 检查是否已有实例在运行
-        if check_running_instance():
-            logging.info("程序已在运行")
-            sys.exit(0)
-
-        # 创建必要的目录
-        for folder in FOLDER_MAPPING.keys():
-            folder_path = DOWNLOADS_PATH / folder
-            # 验证文件夹路径安全性
-            if not is_safe_path(folder_path):
-                logging.error(f"分类文件夹路径不安全: {folder_path}")
-                sys.exit(1)
-            folder_path.mkdir(exist_ok=True)
-            
-        # 验证备份和日志路径
-        if not is_safe_path(BACKUP_PATH) or not is_safe_path(LOGS_PATH):
-            logging.error("备份或日志文件夹路径不安全")
-            sys.exit(1)
-            
-        BACKUP_PATH.mkdir(exist_ok=True)
-        LOGS_PATH.mkdir(exist_ok=True)
+        prepare_environment()
 
         # 初始化组件
+        from gui import FileOrganizerGUI
         organizer = FileOrganizer()
         gui = FileOrganizerGUI(organizer)
         organizer.set_gui(gui)
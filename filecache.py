@@ -0,0 +1,123 @@
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+
+class FileIdentity(NamedTuple):
+    """文件身份：同一文件重命名后不变，同名的新文件会不同"""
+    device: int
+    inode: int      # Windows 上为文件ID
+    size: int
+    mtime_ns: int
+
+
+def identity_of(st: os.stat_result) -> FileIdentity:
+    """从 stat 结果获取文件身份"""
+    return FileIdentity(st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class ProcessedFileCache:
+    """已处理文件缓存
+
+    按文件身份而不是路径记录已处理的文件，重命名后仍能识别，同名重新下载的文件
+    也不会被误判为已处理。每个条目同时保存处理时的分类结果，重命名后分类改变
+    （如 "report" 改名为 "report.pdf"）的文件视为新文件。条目按加入时间放入 TTL 桶（每桶 ttl / buckets 秒），
+    过期时整桶丢弃，不需要逐条检查或访问磁盘；总条目数超过 max_entries 时
+    从最旧的桶开始淘汰，内存占用有固定上限。"""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 7 * 24 * 3600, buckets: int = 168):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.buckets = buckets
+        self.bucket_width = ttl / buckets
+        self._lock = threading.Lock()
+        self._index: Dict[FileIdentity, Tuple[int, str]] = {}  # 文件身份 -> (所在桶编号, 分类结果)
+        self._buckets: Deque[Tuple[int, Deque[FileIdentity]]] = deque()
+        self._slots = 0  # 所有桶中的条目数（包括已移到新桶的旧条目）
+
+        # 统计计数
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def _bucket_number(self, now: Optional[float] = None) -> int:
+        return int((time.time() if now is None else now) // self.bucket_width)
+
+    def _drop(self, bucket_no: int, identity: FileIdentity) -> bool:
+        """从索引中删除仍属于该桶的条目（需持有锁）"""
+        entry = self._index.get(identity)
+        if entry is not None and entry[0] == bucket_no:
+            del self._index[identity]
+            return True
+        return False
+
+    def _expire(self, current: int) -> None:
+        """丢弃过期的桶（需持有锁）"""
+        while self._buckets and self._buckets[0][0] <= current - self.buckets:
+            bucket_no, identities = self._buckets.popleft()
+            self._slots -= len(identities)
+            for identity in identities:
+                if self._drop(bucket_no, identity):
+                    self.expired += 1
+
+    def _evict(self) -> None:
+        """条目数超过上限时从最旧的桶开始淘汰（需持有锁）"""
+        while self._slots > self.max_entries and self._buckets:
+            bucket_no, identities = self._buckets[0]
+            identity = identities.popleft()
+            self._slots -= 1
+            if self._drop(bucket_no, identity):
+                self.evicted += 1
+            if not identities:
+                self._buckets.popleft()
+
+    def add(self, st: os.stat_result, decision: str = "", now: Optional[float] = None) -> None:
+        """记录已处理的文件
+        参数:
+            decision: 处理时的分类结果（未知类型为空字符串）"""
+        identity = identity_of(st)
+        current = self._bucket_number(now)
+        with self._lock:
+            self._expire(current)
+            if self._index.get(identity) == (current, decision):
+                return
+            if not self._buckets or self._buckets[-1][0] != current:
+                self._buckets.append((current, deque()))
+            self._buckets[-1][1].append(identity)
+            self._index[identity] = (current, decision)
+            self._slots += 1
+            self._evict()
+
+    def contains(self, st: os.stat_result, decision: str = "", now: Optional[float] = None) -> bool:
+        """文件是否已处理过，且当时的分类结果与 decision 相同"""
+        identity = identity_of(st)
+        with self._lock:
+            self._expire(self._bucket_number(now))
+            entry = self._index.get(identity)
+            if entry is not None and entry[1] == decision:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def expire(self, now: Optional[float] = None) -> None:
+        """丢弃过期的条目"""
+        with self._lock:
+            self._expire(self._bucket_number(now))
+
+    def stats(self) -> Dict[str, int]:
+        """返回缓存统计"""
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "evicted": self.evicted,
+            }
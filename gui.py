@@ -3,16 +3,16 @@ from tkinter import ttk, scrolledtext
 import threading
 from datetime import datetime
 from pathlib import Path
-import pystray
-from PIL import Image
 import io
 import base64
 import customtkinter as ctk
 from config import *
-from utils import get_file_stats, get_recent_logs
-from utils_win import show_welcome_notification
+from utils import get_file_stats, get_recent_logs, file_stats, log_buffer, iter_cleanup_candidates, run_cleanup
+from platforms import get_platform
 import logging
 import queue
+import time
+from array import array
 
 # 设置主题和外观
 ctk.set_appearance_mode("light")  # 使用亮色主题
@@ -61,7 +61,7 @@ class FileOrganizerGUI:
         self.setup_tray()
         
         # 显示欢迎通知
-        show_welcome_notification(lambda: self.msg_queue.put(("show_window", None)))
+        get_platform().notify(on_click=lambda: self.msg_queue.put(("show_window", None)))
         
         # 启动时自动开始整理
         self.root.after(1000, self.start_organize)
@@ -70,6 +70,8 @@ class FileOrganizerGUI:
         self.root.after(100, self.process_messages)
         
         # 启动日志和统计更新
+        self.last_log_seq = 0  # 已显示的最后一条日志序号
+        self.max_log_lines = 100
         self.update_logs()
         self.update_stats()
 
@@ -86,6 +88,9 @@ class FileOrganizerGUI:
                     self.stop_organize()
                 elif msg[0] == "quit":
                     self.root.quit()
+                elif msg[0] == "cleanup":
+                    dialog, event, payload = msg[1]
+                    dialog.handle(event, payload)
         except queue.Empty:
             pass
         self.root.after(100, self.process_messages)
@@ -96,8 +101,15 @@ class FileOrganizerGUI:
         self.minimize_to_tray()
 
     def setup_tray(self):
-        """设置系统托盘"""
-        # 创建托盘图标
+        """设置系统托盘（托盘库在后台线程中导入和创建，不阻塞启动）"""
+        self.tray_icon = None
+        threading.Thread(target=self.run_tray, daemon=True).start()
+
+    def create_tray_icon(self):
+        """创建托盘图标"""
+        import pystray
+        from PIL import Image
+
         icon = Image.new('RGBA', (64, 64), color=(73, 109, 137, 255))
         
         menu = (
@@ -107,7 +119,7 @@ class FileOrganizerGUI:
             pystray.MenuItem('退出程序', lambda: self.msg_queue.put(("quit", None)))
         )
         
-        self.tray_icon = pystray.Icon(
+        tray_icon = pystray.Icon(
             "file_organizer",
             icon,
             "文件自动整理",
@@ -115,14 +127,13 @@ class FileOrganizerGUI:
         )
         
         # 添加双击回调
-        self.tray_icon.on_activate = lambda: self.msg_queue.put(("show_window", None))
-        
-        # 在新线程中运行托盘图标
-        threading.Thread(target=self.run_tray, daemon=True).start()
+        tray_icon.on_activate = lambda: self.msg_queue.put(("show_window", None))
+        return tray_icon
 
     def run_tray(self):
         """运行托盘图标"""
         try:
+            self.tray_icon = self.create_tray_icon()
             self.tray_icon.run()
         except Exception as e:
             logging.error(f"托盘图标运行出错: {e}")
@@ -132,7 +143,8 @@ class FileOrganizerGUI:
     def minimize_to_tray(self):
         """最小化到系统托盘"""
         self.root.withdraw()
-        self.tray_icon.visible = True
+        if self.tray_icon:
+            self.tray_icon.visible = True
 
     def show_window(self):
         """显示主窗口"""
@@ -143,8 +155,9 @@ class FileOrganizerGUI:
     def quit_app(self):
         """退出应用"""
         self.stop_organize()
-        self.tray_icon.visible = False
-        self.tray_icon.stop()
+        if self.tray_icon:
+            self.tray_icon.visible = False
+            self.tray_icon.stop()
         self.root.quit()
 
     def setup_gui(self):
@@ -217,7 +230,7 @@ class FileOrganizerGUI:
         ctk.CTkButton(
             control_frame,
             text="刷新统计",
-            command=self.update_stats,
+            command=self.refresh_stats,
             **normal_style
         ).pack(side=tk.LEFT, padx=10, pady=10)
 
@@ -339,8 +352,12 @@ class FileOrganizerGUI:
         self.status_var.set("已停止")
         self.organizer.stop()
 
+    def refresh_stats(self):
+        """在后台重新扫描下载文件夹，校准统计信息"""
+        file_stats.reconcile_in_background()
+
     def update_stats(self):
-        """更新统计信息"""
+        """更新统计信息（只读取内存中的计数）"""
         stats = get_file_stats()
         for category, count in stats.items():
             if category in self.stats_labels:
@@ -350,21 +367,22 @@ class FileOrganizerGUI:
     def update_logs(self):
         """更新日志显示"""
         try:
-            # 获取当前滚动位置
-            current_pos = self.log_text.yview()
-            
-            # 获取当前文本和新日志
-            current_text = self.log_text.get("1.0", tk.END).strip()
-            new_logs = "".join(get_recent_logs(100)).strip()
+            # 从内存日志缓冲区取出上次显示之后的记录
+            new_lines, self.last_log_seq = log_buffer.get_since(self.last_log_seq)
+            new_lines = new_lines[-self.max_log_lines:]
             
-            # 只有当日志内容变化时才更新
-            if new_logs != current_text:
+            # 只有当有新日志时才更新
+            if new_lines:
                 # 判断是否在底部
-                at_bottom = current_pos[1] >= 0.99
+                at_bottom = self.log_text.yview()[1] >= 0.99
                 
-                # 更新文本
-                self.log_text.delete("1.0", tk.END)
-                self.log_text.insert(tk.END, new_logs)
+                # 追加新日志，并删除超出显示行数的旧日志
+                self.log_text.insert(tk.END, "\n".join(new_lines) + "\n")
+                # 按文本框实际行数计算（一条记录可能包含多行，如异常堆栈）
+                line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+                excess = line_count - self.max_log_lines
+                if excess > 0:
+                    self.log_text.delete("1.0", f"{excess + 1}.0")
                 
                 # 只有在底部时才自动滚动
                 if at_bottom:
@@ -403,8 +421,170 @@ class FileOrganizerGUI:
 
     def show_cleanup_dialog(self):
         """显示清理对话框"""
-        from utils import scan_files_for_cleanup, cleanup_files
-        
+        CleanupDialog(self)
+
+    def run(self):
+        """运行GUI"""
+        self.root.mainloop()
+
+    def update_status(self, message: str):
+        """更新状态信息"""
+        self.status_var.set(message) 
+
+
+class VirtualCandidateList:
+    """虚拟化的清理文件列表
+
+    数据保存在按列存放的内存数组中，Treeview 只保留与可见行数相同的条目，
+    滚动时改写这些条目的内容。排序只重排索引数组，不重建控件。"""
+
+    COLUMNS = ("文件名", "大小", "修改时间", "清理原因")
+
+    def __init__(self, parent):
+        self.names = []
+        self.sizes = array("q")
+        self.mtimes = array("d")
+        self.reasons = []
+        self.order = []           # 显示顺序 -> 数据索引
+        self.top = 0              # 第一条可见行对应的显示位置
+        self.visible = 20         # 可见行数，随窗口大小更新
+        self.sort_column = None
+        self.sort_reverse = False
+
+        self.tree = ttk.Treeview(parent, columns=self.COLUMNS, show="headings",
+                                 height=self.visible, selectmode="none")
+        for col in self.COLUMNS:
+            self.tree.heading(col, text=col, command=lambda c=col: self.sort_by(c))
+            self.tree.column(col, width=100)
+
+        self.scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_mousewheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+
+    def __len__(self):
+        return len(self.order)
+
+    def extend(self, candidates):
+        """追加扫描结果 (CleanupCandidate)"""
+        start = len(self.names)
+        for candidate in candidates:
+            self.names.append(candidate.path.name)
+            self.sizes.append(candidate.size)
+            self.mtimes.append(candidate.mtime)
+            self.reasons.append(candidate.reason)
+        self.order.extend(range(start, len(self.names)))
+        if self.sort_column is not None:
+            self.apply_sort()
+        self.render()
+
+    def sort_key(self, column):
+        """返回排序用的数组"""
+        return {
+            "文件名": self.names,
+            "大小": self.sizes,
+            "修改时间": self.mtimes,
+            "清理原因": self.reasons,
+        }[column]
+
+    def sort_by(self, column):
+        """点击表头排序，再次点击同一列时反向"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            # 大小默认从大到小
+            self.sort_reverse = column == "大小"
+        self.apply_sort()
+        self.top = 0
+        self.render()
+
+    def apply_sort(self):
+        """按当前排序列重排索引数组"""
+        key = self.sort_key(self.sort_column)
+        self.order.sort(key=key.__getitem__, reverse=self.sort_reverse)
+        for col in self.COLUMNS:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if col == self.sort_column else ""
+            self.tree.heading(col, text=col + arrow)
+
+    def row_values(self, index):
+        """格式化一行数据（只在显示时计算）"""
+        return (
+            self.names[index],
+            f"{self.sizes[index] / (1024 * 1024):.1f} MB",
+            datetime.fromtimestamp(self.mtimes[index]).strftime("%Y-%m-%d %H:%M"),
+            self.reasons[index]
+        )
+
+    def render(self):
+        """把可见窗口内的数据写入 Treeview 的固定条目"""
+        total = len(self.order)
+        self.top = max(0, min(self.top, total - self.visible))
+        rows = self.order[self.top:self.top + self.visible]
+
+        items = self.tree.get_children()
+        for i, index in enumerate(rows):
+            values = self.row_values(index)
+            if i < len(items):
+                self.tree.item(items[i], values=values)
+            else:
+                self.tree.insert("", tk.END, values=values)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        if total:
+            self.scrollbar.set(self.top / total, (self.top + len(rows)) / total)
+        else:
+            self.scrollbar.set(0, 1)
+
+    def yview(self, *args):
+        """滚动条回调"""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.order))
+            self.render()
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self.scroll(step * self.visible if args[2] == "pages" else step)
+
+    def scroll(self, rows):
+        """滚动指定行数"""
+        self.top += rows
+        self.render()
+
+    def on_mousewheel(self, event):
+        """Windows 鼠标滚轮"""
+        self.scroll(-3 if event.delta > 0 else 3)
+
+    def on_resize(self, event):
+        """窗口大小变化时重新计算可见行数"""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        visible = max(1, (event.height - row_height) // row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
+
+
+class CleanupDialog:
+    """清理文件对话框
+
+    扫描和清理都在后台线程中执行，进度和结果通过 msg_queue 发回，
+    由 FileOrganizerGUI.process_messages 在主线程中调用 handle() 更新界面。"""
+
+    def __init__(self, gui: FileOrganizerGUI):
+        self.gui = gui
+        self.candidates = []
+        self.cancel_event = threading.Event()
+        self.state = "scanning"  # scanning / ready / cleaning / closed
+
+        self.setup_dialog()
+        threading.Thread(target=self.scan_worker, daemon=True).start()
+
+    def setup_dialog(self):
+        """创建对话框界面"""
         # 定义按钮样式
         button_style = {
             "font": ("Microsoft YaHei UI", 13),
@@ -419,140 +599,165 @@ class FileOrganizerGUI:
             "fg_color": COLORS["warning"],
             "hover_color": "#E5A102"
         })
-        
-        # 扫描需要清理的文件
-        progress_var = tk.StringVar(value="正在扫描文件...")
-        progress_label = ctk.CTkLabel(
-            self.root,
-            textvariable=progress_var,
-            font=("Microsoft YaHei UI", 12)
-        )
-        progress_label.pack(side=tk.BOTTOM, padx=10, pady=5)
-        self.root.update()
-        
-        cleanup_list = scan_files_for_cleanup()
-        progress_label.destroy()
-        
-        if not cleanup_list:
-            tk.messagebox.showinfo("清理文件", "没有找到需要清理的文件")
-            return
-            
+
         # 创建清理对话框
-        dialog = ctk.CTkToplevel(self.root)
-        dialog.title("清理文件")
-        dialog.geometry("600x400")
-        dialog.transient(self.root)
-        dialog.grab_set()
+        self.dialog = ctk.CTkToplevel(self.gui.root)
+        self.dialog.title("清理文件")
+        self.dialog.geometry("600x400")
+        self.dialog.transient(self.gui.root)
+        self.dialog.grab_set()
+        self.dialog.protocol("WM_DELETE_WINDOW", self.cancel)
         
         # 文件列表
-        list_frame = ctk.CTkFrame(dialog)
+        list_frame = ctk.CTkFrame(self.dialog)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
         
-        # 创建Treeview
-        columns = ("文件名", "大小", "修改时间", "清理原因")
-        tree = ttk.Treeview(list_frame, columns=columns, show="headings")
-        
-        # 设置列
-        for col in columns:
-            tree.heading(col, text=col)
-            tree.column(col, width=100)
-        
-        # 添加文件
-        for file_path, reason in cleanup_list:
-            try:
-                size_mb = file_path.stat().st_size / (1024 * 1024)
-                mtime = datetime.fromtimestamp(file_path.stat().st_mtime)
-                tree.insert("", tk.END, values=(
-                    file_path.name,
-                    f"{size_mb:.1f} MB",
-                    mtime.strftime("%Y-%m-%d %H:%M"),
-                    reason
-                ))
-            except Exception:
-                continue
-                
-        tree.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # 添加滚动条
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        tree.configure(yscrollcommand=scrollbar.set)
+        # 文件列表（只为可见行创建控件）
+        self.file_list = VirtualCandidateList(list_frame)
         
         # 控制按钮
-        btn_frame = ctk.CTkFrame(dialog)
+        btn_frame = ctk.CTkFrame(self.dialog)
         btn_frame.pack(fill=tk.X, padx=20, pady=10)
         
-        # 清理进度
-        progress_var = tk.StringVar(value="准备清理...")
-        progress_label = ctk.CTkLabel(
+        # 扫描/清理进度
+        self.progress_var = tk.StringVar(value="正在扫描文件...")
+        ctk.CTkLabel(
             btn_frame,
-            textvariable=progress_var,
+            textvariable=self.progress_var,
             font=("Microsoft YaHei UI", 12)
-        )
-        progress_label.pack(side=tk.LEFT, padx=10)
-        
-        def update_progress(current, total, file_path, reason):
-            progress_var.set(f"正在清理 ({current}/{total}): {file_path.name}")
-            dialog.update()
-        
-        def do_cleanup():
-            if not tk.messagebox.askyesno(
-                "确认清理",
-                f"确定要清理这 {len(cleanup_list)} 个文件吗？\n"
-                "文件将被移动到回收站，可以手动恢复。"
-            ):
-                return
-                
-            # 禁用按钮
-            clean_btn.configure(state="disabled")
-            cancel_btn.configure(state="disabled")
-            
-            try:
-                # 执行清理
-                stats = cleanup_files(cleanup_list, update_progress)
-                
-                # 显示结果
-                tk.messagebox.showinfo(
-                    "清理完成",
-                    f"清理完成:\n"
-                    f"- 成功: {stats['success']}\n"
-                    f"- 失败: {stats['failed']}\n"
-                    f"- 跳过: {stats['skipped']}"
-                )
-            except Exception as e:
-                tk.messagebox.showerror(
-                    "清理出错",
-                    f"清理过程中出错:\n{str(e)}"
-                )
-            finally:
-                # 关闭对话框
-                dialog.destroy()
-                
-                # 刷新统计
-                self.update_stats()
+        ).pack(side=tk.LEFT, padx=10)
         
         # 添加按钮
-        clean_btn = ctk.CTkButton(
+        self.clean_btn = ctk.CTkButton(
             btn_frame,
             text="开始清理",
-            command=do_cleanup,
+            command=self.start_cleanup,
             width=100,
+            state="disabled",
             **warning_style
         )
-        clean_btn.pack(side=tk.RIGHT, padx=5)
+        self.clean_btn.pack(side=tk.RIGHT, padx=5)
         
-        cancel_btn = ctk.CTkButton(
+        self.cancel_btn = ctk.CTkButton(
             btn_frame,
             text="取消",
-            command=dialog.destroy,
+            command=self.cancel,
             width=100
         )
-        cancel_btn.pack(side=tk.RIGHT, padx=5)
+        self.cancel_btn.pack(side=tk.RIGHT, padx=5)
 
-    def run(self):
-        """运行GUI"""
-        self.root.mainloop()
+    def post(self, event: str, payload=None):
+        """从后台线程向主线程发送消息"""
+        self.gui.msg_queue.put(("cleanup", (self, event, payload)))
 
-    def update_status(self, message: str):
-        """更新状态信息"""
-        self.status_var.set(message) 
\ No newline at end of file
+    def scan_worker(self):
+        """后台扫描需要清理的文件，分批发回主线程"""
+        batch = []
+        last_post = time.monotonic()
+        candidates = iter_cleanup_candidates(self.cancel_event)
+        try:
+            for candidate in candidates:
+                batch.append(candidate)
+                if len(batch) >= 500 or time.monotonic() - last_post >= 0.1:
+                    self.post("found", batch)
+                    batch = []
+                    last_post = time.monotonic()
+        except Exception as e:
+            self.post("error", f"扫描过程中出错:\n{str(e)}")
+            return
+        finally:
+            candidates.close()
+        if batch:
+            self.post("found", batch)
+        self.post("scan_done")
+
+    def cleanup_worker(self, files):
+        """后台清理文件"""
+        try:
+            report = run_cleanup(
+                files,
+                lambda current, total, file_path, reason: self.post("progress", (current, total, file_path.name)),
+                self.cancel_event
+            )
+            self.post("done", report)
+        except Exception as e:
+            self.post("error", f"清理过程中出错:\n{str(e)}")
+
+    def handle(self, event: str, payload):
+        """在主线程中处理后台线程的消息"""
+        if self.state == "closed":
+            return
+
+        if event == "found":
+            self.add_candidates(payload)
+            self.progress_var.set(f"正在扫描文件... 已找到 {len(self.candidates)} 个")
+
+        elif event == "scan_done":
+            if self.cancel_event.is_set():
+                self.close()
+            elif not self.candidates:
+                self.close()
+                tk.messagebox.showinfo("清理文件", "没有找到需要清理的文件")
+            else:
+                self.state = "ready"
+                self.progress_var.set(f"共 {len(self.candidates)} 个文件，准备清理...")
+                self.clean_btn.configure(state="normal")
+
+        elif event == "progress":
+            current, total, name = payload
+            self.progress_var.set(f"正在清理 ({current}/{total}): {name}")
+
+        elif event == "done":
+            stats = payload.stats
+            self.close()
+            tk.messagebox.showinfo(
+                "清理完成",
+                f"清理{'已取消' if payload.cancelled else '完成'}:\n"
+                f"- 成功: {stats['success']}\n"
+                f"- 失败: {stats['failed']}\n"
+                f"- 跳过: {stats['skipped']}"
+            )
+
+        elif event == "error":
+            self.close()
+            tk.messagebox.showerror("清理出错", payload)
+
+    def add_candidates(self, candidates):
+        """把扫描到的文件加入列表"""
+        self.candidates.extend(candidates)
+        self.file_list.extend(candidates)
+
+    def start_cleanup(self):
+        """确认后在后台开始清理"""
+        if self.state != "ready":
+            return
+        if not tk.messagebox.askyesno(
+            "确认清理",
+            f"确定要清理这 {len(self.candidates)} 个文件吗？\n"
+            "文件将被移动到回收站，可以手动恢复。",
+            parent=self.dialog
+        ):
+            return
+
+        self.state = "cleaning"
+        self.clean_btn.configure(state="disabled")
+        self.progress_var.set("准备清理...")
+        files = [(candidate.path, candidate.reason) for candidate in self.candidates]
+        threading.Thread(target=self.cleanup_worker, args=(files,), daemon=True).start()
+
+    def cancel(self):
+        """取消按钮：扫描或清理进行中时停止任务，否则关闭对话框"""
+        if self.state in ("scanning", "cleaning"):
+            self.cancel_event.set()
+            self.cancel_btn.configure(state="disabled")
+            self.progress_var.set("正在取消...")
+        else:
+            self.close()
+
+    def close(self):
+        """关闭对话框"""
+        self.state = "closed"
+        self.cancel_event.set()
+        self.dialog.destroy()
+        # 刷新统计
+        self.gui.refresh_stats()
@@ -0,0 +1,181 @@
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+
+class InUseBackend:
+    """文件占用检测后端
+
+    probe() 接收一批路径，返回其中被占用的路径集合。"""
+
+    name = "base"
+
+    def probe(self, paths: Iterable[Path]) -> Set[Path]:
+        raise NotImplementedError
+
+
+class OpenProbeBackend(InUseBackend):
+    """以只读方式打开文件，打开失败视为被占用（Windows 下被独占锁定的文件无法打开）"""
+
+    name = "open"
+
+    def probe(self, paths: Iterable[Path]) -> Set[Path]:
+        in_use = set()
+        for path in paths:
+            try:
+                with open(path, 'rb'):
+                    pass
+            except (IOError, PermissionError):
+                in_use.add(path)
+        return in_use
+
+
+class ProcFdBackend(InUseBackend):
+    """扫描 /proc/*/fd，找出被其他进程打开的文件（Linux）
+
+    一批路径只需扫描一次 /proc，不需要逐个打开文件。只能看到有权限访问的进程。"""
+
+    name = "proc"
+
+    def __init__(self, proc_root: str = "/proc"):
+        self.proc_root = proc_root
+
+    @classmethod
+    def available(cls, proc_root: str = "/proc") -> bool:
+        return sys.platform.startswith("linux") and os.path.isdir(os.path.join(proc_root, "self", "fd"))
+
+    def _open_files(self, wanted: Set[str]) -> Set[str]:
+        """返回 wanted 中被其他进程打开的路径"""
+        found = set()
+        own_pid = str(os.getpid())
+        try:
+            processes = os.scandir(self.proc_root)
+        except OSError as e:
+            logging.debug(f"无法读取 {self.proc_root}: {e}")
+            return found
+        with processes:
+            for proc in processes:
+                if not proc.name.isdigit() or proc.name == own_pid:
+                    continue
+                try:
+                    with os.scandir(os.path.join(proc.path, "fd")) as fds:
+                        for fd in fds:
+                            try:
+                                target = os.readlink(fd.path)
+                            except OSError:
+                                continue
+                            if target in wanted:
+                                found.add(target)
+                except OSError:
+                    # 进程已退出或没有权限
+                    continue
+                if len(found) == len(wanted):
+                    break
+        return found
+
+    def probe(self, paths: Iterable[Path]) -> Set[Path]:
+        resolved: Dict[str, Path] = {}
+        for path in paths:
+            resolved[os.path.realpath(path)] = path
+        if not resolved:
+            return set()
+        return {resolved[target] for target in self._open_files(set(resolved))}
+
+
+def default_backend(name: str = "auto") -> InUseBackend:
+    """根据名称创建后端: auto / open / proc"""
+    if name == "proc" or (name == "auto" and ProcFdBackend.available()):
+        return ProcFdBackend()
+    return OpenProbeBackend()
+
+
+class InUseDetector:
+    """批量文件占用检测
+
+    每批路径先各 stat 一次：
+    - 最近 stable_window 秒内修改过的文件视为仍在写入，直接判定为占用；
+    - 大小和修改时间与上次"未占用"结果相同且未超过 cache_ttl 的文件直接复用结果；
+    其余文件交给后端一次性检测，未占用的结果会被缓存。"""
+
+    def __init__(self, backend: Optional[InUseBackend] = None,
+                 stable_window: float = 2.0, cache_ttl: float = 30.0):
+        self.backend = backend or default_backend()
+        self.stable_window = stable_window
+        self.cache_ttl = cache_ttl
+        self._lock = threading.Lock()
+        # 未占用结果缓存: 路径 -> (大小, 修改时间, 过期时间)
+        self._free: Dict[Path, Tuple[int, float, float]] = {}
+
+        # 统计计数
+        self.cache_hits = 0
+        self.probed = 0
+
+    def check_batch(self, paths: Iterable[Path]) -> Set[Path]:
+        """返回一批路径中被占用的路径，不存在的文件不算占用"""
+        now = time.time()
+        monotonic = time.monotonic()
+        in_use = set()
+        to_probe = {}
+
+        with self._lock:
+            for path in paths:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    self._free.pop(path, None)
+                    continue
+                if 0 <= now - st.st_mtime < self.stable_window:
+                    in_use.add(path)
+                    continue
+                cached = self._free.get(path)
+                if cached and cached[0] == st.st_size and cached[1] == st.st_mtime and cached[2] > monotonic:
+                    self.cache_hits += 1
+                    continue
+                to_probe[path] = (st.st_size, st.st_mtime)
+
+        if not to_probe:
+            return in_use
+
+        try:
+            busy = self.backend.probe(list(to_probe))
+        except Exception as e:
+            logging.error(f"检测文件占用时出错: {e}")
+            return in_use | set(to_probe)
+
+        expires = time.monotonic() + self.cache_ttl
+        with self._lock:
+            self.probed += len(to_probe)
+            for path, (size, mtime) in to_probe.items():
+                if path in busy:
+                    self._free.pop(path, None)
+                else:
+                    self._free[path] = (size, mtime, expires)
+            if len(self._free) > 4096:
+                self._prune(time.monotonic())
+        return in_use | busy
+
+    def is_in_use(self, path: Path) -> bool:
+        """检查单个文件是否被占用"""
+        return path in self.check_batch([path])
+
+    def forget(self, path: Path) -> None:
+        """移除文件的缓存结果（文件被移动或删除后调用）"""
+        with self._lock:
+            self._free.pop(path, None)
+
+    def _prune(self, monotonic: float) -> None:
+        """删除过期的缓存条目"""
+        self._free = {path: entry for path, entry in self._free.items() if entry[2] > monotonic}
+
+    def stats(self) -> Dict[str, int]:
+        """返回检测统计"""
+        with self._lock:
+            return {
+                "cache_hits": self.cache_hits,
+                "probed": self.probed,
+                "cached": len(self._free),
+            }
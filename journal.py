@@ -0,0 +1,156 @@
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, NamedTuple, Optional
+
+# 文件状态
+STATE_PENDING = "pending"  # 等待延迟时间到期
+STATE_DONE = "done"        # 已整理（已移出下载文件夹）
+STATE_SKIPPED = "skipped"  # 未知类型，保留在原位置
+
+
+class JournalEntry(NamedTuple):
+    path: str
+    first_seen: float
+    size: int
+    mtime: float
+    state: str
+    updated: float
+
+
+class FileJournal:
+    """持久化的文件处理日志
+
+    使用 WAL 模式的 SQLite 记录每个文件的首次发现时间、大小、修改时间和处理状态，
+    程序重启后延迟计时可以继续，而不是从头开始。启动时一次性读入内存，
+    之后的查询只访问内存中的副本。"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, JournalEntry] = {}
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY,"
+            " first_seen REAL NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " state TEXT NOT NULL,"
+            " updated REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self) -> None:
+        """读入全部记录"""
+        cursor = self._conn.execute(
+            "SELECT path, first_seen, size, mtime, state, updated FROM files"
+        )
+        self._entries = {row[0]: JournalEntry(*row) for row in cursor}
+        logging.info(f"已加载文件处理记录: {len(self._entries)} 条")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[JournalEntry]:
+        return iter(list(self._entries.values()))
+
+    def get(self, path: str) -> Optional[JournalEntry]:
+        """获取文件记录"""
+        return self._entries.get(path)
+
+    def state(self, path: str) -> Optional[str]:
+        """获取文件状态，没有记录时返回None"""
+        entry = self._entries.get(path)
+        return entry.state if entry else None
+
+    def record(self, path: str, state: str, first_seen: float,
+               size: int = 0, mtime: float = 0.0) -> None:
+        """写入或覆盖文件记录"""
+        entry = JournalEntry(path, first_seen, size, mtime, state, time.time())
+        with self._lock:
+            self._entries[path] = entry
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?)", entry
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"写入文件处理记录失败 {path}: {e}")
+
+    def set_state(self, path: str, state: str) -> None:
+        """更新文件状态，保留首次发现时间等信息"""
+        entry = self._entries.get(path)
+        if entry is None:
+            self.record(path, state, time.time())
+        else:
+            self.record(path, state, entry.first_seen, entry.size, entry.mtime)
+
+    def forget(self, path: str) -> None:
+        """删除文件记录"""
+        with self._lock:
+            if self._entries.pop(path, None) is None:
+                return
+            try:
+                self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"删除文件处理记录失败 {path}: {e}")
+
+    def prune(self, max_age: float) -> int:
+        """删除超过指定时间（秒）未更新的记录，返回删除数量
+        已删除的文件在收到删除事件或到期处理时就会删除记录，这里不访问磁盘"""
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [path for path, entry in self._entries.items() if entry.updated < cutoff]
+            for path in expired:
+                del self._entries[path]
+            try:
+                self._conn.execute("DELETE FROM files WHERE updated < ?", (cutoff,))
+                self._conn.commit()
+                self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                logging.error(f"清理文件处理记录失败: {e}")
+        return len(expired)
+
+    def get_meta(self, key: str) -> Optional[str]:
+        """读取附加信息（如补扫进度）"""
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            except sqlite3.Error as e:
+                logging.error(f"读取记录信息失败 {key}: {e}")
+                return None
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: Optional[str]) -> None:
+        """写入附加信息，value为None时删除"""
+        with self._lock:
+            try:
+                if value is None:
+                    self._conn.execute("DELETE FROM meta WHERE key = ?", (key,))
+                else:
+                    self._conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logging.error(f"写入记录信息失败 {key}: {e}")
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                pass
@@ -0,0 +1,73 @@
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class PathPolicy:
+    """下载文件夹路径安全策略
+
+    根目录只在创建时解析一次。检查路径时只解析其所在文件夹（结果缓存，
+    同一文件夹下的文件和各分类文件夹只需解析一次），再按路径组成部分
+    判断是否位于根目录内，"Downloads2" 不会被误认为在 "Downloads" 内。
+    受保护文件夹的检查只需对相对根目录的各部分做一次集合查找。"""
+
+    def __init__(self, root: Path, protected: Iterable[str] = (), max_cached: int = 1024):
+        self.root = Path(root)
+        self.resolved_root = self.root.resolve()
+        self._root_key = self._key(self.resolved_root.parts)
+        self.protected = frozenset(protected)
+        self.max_cached = max_cached
+        self._dirs: Dict[str, Path] = {}  # 文件夹 -> 解析后的路径
+
+    @staticmethod
+    def _key(parts: Tuple[str, ...]) -> Tuple[str, ...]:
+        """用于比较的路径组成部分（在不区分大小写的系统上忽略大小写）"""
+        return tuple(os.path.normcase(part) for part in parts)
+
+    def _resolve_dir(self, folder: Path) -> Path:
+        """解析文件夹路径（带缓存）"""
+        key = str(folder)
+        resolved = self._dirs.get(key)
+        if resolved is None:
+            resolved = folder.resolve()
+            if len(self._dirs) >= self.max_cached:
+                self._dirs.clear()
+            self._dirs[key] = resolved
+        return resolved
+
+    def resolve(self, path: Path) -> Path:
+        """解析路径：所在文件夹使用缓存，路径本身是符号链接时完整解析"""
+        path = Path(path)
+        if path.name in ("", ".", "..") or os.path.islink(path):
+            return path.resolve()
+        return self._resolve_dir(path.parent) / path.name
+
+    def relative_parts(self, path: Path) -> Optional[Tuple[str, ...]]:
+        """返回路径相对根目录的各组成部分，不在根目录内时返回None"""
+        parts = self.resolve(path).parts
+        depth = len(self._root_key)
+        if len(parts) < depth or self._key(parts[:depth]) != self._root_key:
+            return None
+        return parts[depth:]
+
+    def contains(self, path: Path) -> bool:
+        """检查路径是否在根目录内（包括根目录本身）"""
+        try:
+            return self.relative_parts(path) is not None
+        except Exception as e:
+            logging.error(f"检查路径安全性时出错: {e}")
+            return False
+
+    def is_protected(self, path: Path) -> bool:
+        """路径本身或其任一上级文件夹（根目录以内）是否受保护，不在根目录内的路径视为受保护"""
+        try:
+            parts = self.relative_parts(path)
+        except Exception as e:
+            logging.error(f"检查路径安全性时出错: {e}")
+            return True
+        return parts is None or not self.protected.isdisjoint(parts)
+
+    def clear(self) -> None:
+        """清空文件夹解析缓存"""
+        self._dirs.clear()
@@ -0,0 +1,188 @@
+import logging
+import os
+import re
+import sys
+from pathlib import Path
+from typing import Callable, Optional
+from config import SCRIPT_PATH
+
+# 互斥锁名称
+MUTEX_NAME = "Global\\ClearBOOM_SingleInstance_Mutex"
+# 锁文件名称（非 Windows 平台）
+LOCK_FILE_NAME = "clearboom.lock"
+
+
+class Platform:
+    """平台相关功能接口
+
+    单实例锁、开机自启动、系统通知和系统下载文件夹路径在不同平台上实现不同，
+    整理引擎只通过这个接口使用它们，不直接导入平台模块。"""
+
+    name = "base"
+
+    def acquire_instance_lock(self) -> bool:
+        """获取单实例锁，已有实例在运行时返回False"""
+        raise NotImplementedError
+
+    def release_instance_lock(self) -> None:
+        """释放单实例锁"""
+        raise NotImplementedError
+
+    def add_to_startup(self, file_path: Optional[str] = None) -> bool:
+        """添加程序到开机自启动"""
+        raise NotImplementedError
+
+    def remove_from_startup(self) -> bool:
+        """从开机自启动中移除程序"""
+        raise NotImplementedError
+
+    def is_in_startup(self) -> bool:
+        """检查程序是否在开机自启动中"""
+        raise NotImplementedError
+
+    def notify(self, title: Optional[str] = None, message: Optional[str] = None,
+               on_click: Optional[Callable[[], None]] = None, sound: Optional[str] = None) -> None:
+        """显示系统通知"""
+        raise NotImplementedError
+
+    def downloads_path(self) -> Optional[Path]:
+        """获取系统下载文件夹路径，无法获取时返回None"""
+        raise NotImplementedError
+
+
+class WindowsPlatform(Platform):
+    """Windows: 命名互斥锁、注册表自启动、Toast 通知、注册表中的下载文件夹"""
+
+    name = "windows"
+
+    def __init__(self):
+        self._mutex = None
+
+    def acquire_instance_lock(self) -> bool:
+        import win32event
+        import win32api
+        import winerror
+        try:
+            # 尝试创建一个命名互斥锁
+            self._mutex = win32event.CreateMutex(None, True, MUTEX_NAME)
+            # 如果互斥锁已存在，说明已有实例在运行
+            if win32api.GetLastError() == winerror.ERROR_ALREADY_EXISTS:
+                # 关闭我们的mutex句柄,因为我们不需要它
+                self.release_instance_lock()
+                return False
+            return True
+        except Exception as e:
+            logging.error(f"检查实例时出错: {e}")
+            self.release_instance_lock()
+            return True
+
+    def release_instance_lock(self) -> None:
+        if self._mutex:
+            import win32api
+            win32api.CloseHandle(self._mutex)
+            self._mutex = None
+
+    def add_to_startup(self, file_path: Optional[str] = None) -> bool:
+        from utils_win import add_to_startup
+        return add_to_startup(file_path)
+
+    def remove_from_startup(self) -> bool:
+        from utils_win import remove_from_startup
+        return remove_from_startup()
+
+    def is_in_startup(self) -> bool:
+        from utils_win import is_in_startup
+        return is_in_startup()
+
+    def notify(self, title=None, message=None, on_click=None, sound=None) -> None:
+        from utils_win import show_welcome_notification
+        show_welcome_notification(on_click_callback=on_click, title=title, message=message, sound=sound)
+
+    def downloads_path(self) -> Optional[Path]:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER,
+            r"Software\Microsoft\Windows\CurrentVersion\Explorer\Shell Folders") as key:
+            return Path(winreg.QueryValueEx(key, "{374DE290-123F-4565-9164-39C4925E467B}")[0])
+
+
+class PosixPlatform(Platform):
+    """Linux 等平台: 锁文件、不设置自启动、通知写入日志、XDG 下载文件夹"""
+
+    name = "posix"
+
+    def __init__(self):
+        self._lock_file = None
+
+    @staticmethod
+    def lock_path() -> Path:
+        """锁文件路径，优先使用 XDG_RUNTIME_DIR"""
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir and os.path.isdir(runtime_dir):
+            return Path(runtime_dir) / LOCK_FILE_NAME
+        return Path(SCRIPT_PATH) / LOCK_FILE_NAME
+
+    def acquire_instance_lock(self) -> bool:
+        import fcntl
+        path = self.lock_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            lock_file = open(path, "a+")
+        except OSError as e:
+            logging.error(f"检查实例时出错: {e}")
+            return True
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._lock_file = lock_file
+        return True
+
+    def release_instance_lock(self) -> None:
+        if self._lock_file:
+            self._lock_file.close()
+            self._lock_file = None
+
+    def add_to_startup(self, file_path: Optional[str] = None) -> bool:
+        logging.debug("当前平台不支持开机自启动设置")
+        return False
+
+    def remove_from_startup(self) -> bool:
+        return False
+
+    def is_in_startup(self) -> bool:
+        return False
+
+    def notify(self, title=None, message=None, on_click=None, sound=None) -> None:
+        logging.info(f"[通知] {title or 'ClearBOOM'}: {message or ''}")
+
+    def downloads_path(self) -> Optional[Path]:
+        """按 XDG 规范读取下载文件夹: 环境变量 > user-dirs.dirs > ~/Downloads"""
+        home = Path(os.path.expanduser("~"))
+        value = os.environ.get("XDG_DOWNLOAD_DIR")
+        if not value:
+            config_home = Path(os.environ.get("XDG_CONFIG_HOME") or home / ".config")
+            try:
+                text = (config_home / "user-dirs.dirs").read_text(encoding="utf-8")
+                match = re.search(r'^\s*XDG_DOWNLOAD_DIR\s*=\s*"([^"]*)"', text, re.MULTILINE)
+                if match:
+                    value = match.group(1)
+            except OSError:
+                pass
+        if not value:
+            return home / "Downloads"
+        return Path(value.replace("$HOME", str(home)))
+
+
+_platform: Optional[Platform] = None
+
+def get_platform() -> Platform:
+    """获取当前平台的实现"""
+    global _platform
+    if _platform is None:
+        _platform = WindowsPlatform() if sys.platform == "win32" else PosixPlatform()
+    return _platform
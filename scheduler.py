@@ -0,0 +1,104 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Callable, Dict, Hashable, List, Optional
+
+# 已取消条目的占位标记
+_REMOVED = object()
+
+
+class DeadlineScheduler:
+    """基于最小堆的截止时间调度器
+
+    每个键对应一个到期时间，插入和取消都是 O(log n)（取消为惰性删除）。
+    run() 只在最近的截止时间醒来，没有待处理项时一直挂起，空闲时不占用CPU。
+    到期的键会成批交给 on_due 回调，回调在事件循环线程中执行。"""
+
+    def __init__(self, on_due: Callable[[List[Hashable]], None]):
+        self.on_due = on_due
+        self._heap: List[list] = []  # [到期时间, 序号, 键]
+        self._entries: Dict[Hashable, list] = {}
+        self._counter = itertools.count()
+        self._removed = 0
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def due_time(self, key: Hashable) -> Optional[float]:
+        """返回键的到期时间，不存在时返回None"""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key: Hashable, due: float) -> None:
+        """安排键在指定时间（time.time()时间戳）到期，已存在时更新到期时间"""
+        if key in self._entries:
+            self.cancel(key)
+        entry = [due, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        # 新的截止时间早于当前等待的时间时唤醒调度循环
+        if self._heap[0] is entry and self._wakeup is not None:
+            self._wakeup.set()
+
+    def cancel(self, key: Hashable) -> bool:
+        """取消键，返回是否存在"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        entry[2] = _REMOVED
+        self._removed += 1
+        # 已取消的条目过多时重建堆，保证内存与待处理项数量成正比
+        if self._removed > 1024 and self._removed > len(self._heap) // 2:
+            self._heap = [e for e in self._heap if e[2] is not _REMOVED]
+            heapq.heapify(self._heap)
+            self._removed = 0
+        return True
+
+    def next_deadline(self) -> Optional[float]:
+        """返回最近的到期时间"""
+        while self._heap and self._heap[0][2] is _REMOVED:
+            heapq.heappop(self._heap)
+            self._removed -= 1
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: Optional[float] = None) -> List[Hashable]:
+        """弹出所有已到期的键"""
+        if now is None:
+            now = time.time()
+        due = []
+        while True:
+            deadline = self.next_deadline()
+            if deadline is None or deadline > now:
+                break
+            _, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            due.append(key)
+        return due
+
+    async def run(self) -> None:
+        """调度循环：睡眠到最近的截止时间，然后触发所有到期的键"""
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                deadline = self.next_deadline()
+                timeout = None if deadline is None else max(0.0, deadline - time.time())
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+                keys = self.pop_due()
+                if keys:
+                    try:
+                        self.on_due(keys)
+                    except Exception as e:
+                        logging.error(f"处理到期文件时出错: {e}")
+        finally:
+            self._wakeup = None
@@ -1,18 +1,134 @@
 import os
+import sys
 import shutil
 import logging
 import time
+import threading
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Optional, Tuple, List, Dict
-import psutil
+from typing import Optional, Tuple, List, Dict, NamedTuple, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from config import *
-from logging.handlers import RotatingFileHandler
-import fnmatch
-import send2trash
-
-def setup_logging() -> None:
-    """配置日志系统"""
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
+import queue
+import atexit
+from classifier import get_classifier
+from cleanup_rules import CleanupRules
+from inuse import InUseDetector, default_backend
+from diskspace import FreeSpaceTracker
+
+# 日志轮转配置
+LOG_MAX_BYTES = 5 * 1024 * 1024  # 5MB
+LOG_BACKUP_COUNT = 5  # 保留5个备份
+
+# 当前使用的日志文件
+current_log_file: Optional[Path] = None
+
+class RingBufferHandler(logging.Handler):
+    """内存日志缓冲区
+
+    保存最近 capacity 条格式化后的日志，每条带递增序号，
+    界面只需取出上次显示的序号之后的记录，无需读取日志文件。"""
+
+    def __init__(self, capacity: int = LOG_BUFFER_SIZE):
+        super().__init__()
+        self.records = deque(maxlen=capacity)  # [(序号, 日志文本)]
+        self.last_seq = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            message = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        # Handler.handle() 调用 emit 时已持有 self.lock
+        self.last_seq += 1
+        self.records.append((self.last_seq, message))
+
+    def get_since(self, seq: int) -> Tuple[List[str], int]:
+        """返回序号大于seq的日志和最新序号"""
+        self.acquire()
+        try:
+            new_records = []
+            for record_seq, message in reversed(self.records):
+                if record_seq <= seq:
+                    break
+                new_records.append(message)
+            new_records.reverse()
+            return new_records, self.last_seq
+        finally:
+            self.release()
+
+# 全局内存日志缓冲区
+log_buffer = RingBufferHandler()
+
+class _BatchFlushMixin:
+    """emit 后不立即 flush，由 BatchQueueListener 每处理完一批统一 flush"""
+
+    def flush(self) -> None:
+        pass
+
+    def flush_batch(self) -> None:
+        super().flush()
+
+class BatchRotatingFileHandler(_BatchFlushMixin, RotatingFileHandler):
+    pass
+
+class BatchStreamHandler(_BatchFlushMixin, logging.StreamHandler):
+    pass
+
+class BatchQueueListener(QueueListener):
+    """批量处理日志队列的监听线程
+
+    每条记录照常交给处理器，但只在队列暂时取空或累计 batch_size 条时 flush 一次。"""
+
+    def __init__(self, log_queue, *handlers, batch_size: int = LOG_BATCH_SIZE):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self._unflushed = 0
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        self._unflushed += 1
+        if self._unflushed >= self.batch_size or self.queue.empty():
+            self.flush_handlers()
+
+    def flush_handlers(self) -> None:
+        """flush 所有处理器"""
+        self._unflushed = 0
+        for handler in self.handlers:
+            try:
+                getattr(handler, "flush_batch", handler.flush)()
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        super().stop()
+        # 停止标记之前的最后几条记录可能还未 flush
+        self.flush_handlers()
+
+# 后台日志监听线程（异步模式下使用）
+_log_listener: Optional[BatchQueueListener] = None
+
+def _stop_log_listener() -> None:
+    """停止后台日志线程，写完队列中剩余的日志"""
+    global _log_listener
+    if _log_listener is not None:
+        listener, _log_listener = _log_listener, None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+atexit.register(_stop_log_listener)
+
+def setup_logging(async_mode: Optional[bool] = None) -> None:
+    """配置日志系统
+    参数:
+        async_mode: 是否通过 QueueHandler 在后台线程中批量写日志，默认使用 LOG_ASYNC"""
+    global current_log_file, _log_listener
+    if async_mode is None:
+        async_mode = LOG_ASYNC
     try:
         # 确保日志目录存在
         Path(LOGS_PATH).mkdir(exist_ok=True)
@@ -21,16 +137,18 @@ def setup_logging() -> None:
         log_file = LOGS_PATH / f"organizer_{datetime.now().strftime('%Y%m%d')}.log"
         
         # 创建 RotatingFileHandler
-        file_handler = RotatingFileHandler(
+        file_handler_class = BatchRotatingFileHandler if async_mode else RotatingFileHandler
+        file_handler = file_handler_class(
             filename=log_file,
-            maxBytes=5*1024*1024,      # 5MB
-            backupCount=5,             # 保留5个备份
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
             encoding=LOG_ENCODING
         )
+        current_log_file = log_file
         file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
         
         # 创建控制台处理器
-        console_handler = logging.StreamHandler()
+        console_handler = BatchStreamHandler() if async_mode else logging.StreamHandler()
         console_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
         
         # 配置根日志记录器
@@ -39,10 +157,22 @@ def setup_logging() -> None:
         
         # 清除现有的处理器
         root_logger.handlers.clear()
+        _stop_log_listener()
+        
+        # 内存日志缓冲区（供界面显示）
+        log_buffer.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
         
         # 添加处理器
-        root_logger.addHandler(file_handler)
-        root_logger.addHandler(console_handler)
+        if async_mode:
+            # 调用线程只把记录放入队列，文件和控制台输出由后台线程批量完成
+            log_queue = queue.SimpleQueue()
+            root_logger.addHandler(QueueHandler(log_queue))
+            _log_listener = BatchQueueListener(log_queue, file_handler, console_handler)
+            _log_listener.start()
+        else:
+            root_logger.addHandler(file_handler)
+            root_logger.addHandler(console_handler)
+        root_logger.addHandler(log_buffer)
         
         # 清理旧日志文件
         clean_old_logs()
@@ -50,7 +180,7 @@ def setup_logging() -> None:
         logging.info("日志系统初始化完成")
         
     except Exception as e:
-        print(f"设置日志系统时出错: {e}")
+        print(f"设置日志系统时出错: {e}", file=sys.stderr)
         raise
 
 def clean_old_logs(max_days: int = 7):
@@ -63,64 +193,85 @@ def clean_old_logs(max_days: int = 7):
             # 如果文件超过指定天数,则删除
             if (current_time - file_time).days > max_days:
                 log_file.unlink()
-                print(f"已删除旧日志文件: {log_file}")
+                logging.info(f"已删除旧日志文件: {log_file}")
     except Exception as e:
-        print(f"清理旧日志文件时出错: {e}")
+        logging.error(f"清理旧日志文件时出错: {e}")
+
+# 全局文件占用检测器
+in_use_detector = InUseDetector(
+    default_backend(IN_USE_BACKEND),
+    stable_window=IN_USE_STABLE_WINDOW,
+    cache_ttl=IN_USE_CACHE_TTL
+)
 
 def is_file_in_use(file_path: Path) -> bool:
     """检查文件是否被占用"""
-    try:
-        with open(file_path, 'rb'):
-            return False
-    except (IOError, PermissionError):
-        return True
+    return in_use_detector.is_in_use(file_path)
+
+def files_in_use(paths: List[Path]) -> set:
+    """批量检查文件是否被占用，返回被占用的路径集合"""
+    return in_use_detector.check_batch(paths)
 
 def get_file_category(file_path: Path) -> Optional[str]:
     """获取文件类别"""
+    classifier = get_classifier()
     # 跳过临时文件
-    if file_path.suffix.lower() in ['.tmp', '.crdownload', '.part']:
+    if classifier.is_temp_file(file_path.name):
         logging.debug(f"跳过浏览器下载临时文件: {file_path}")
         return None
-        
-    extension = file_path.suffix.lower()
-    for category, config in FOLDER_MAPPING.items():
-        # 检查是否启用自动整理
-        if not config.get("auto_organize", True):
-            continue
-            
-        if extension in config["extensions"]:
-            return category
-    return None
+
+    return classifier.category(file_path)
 
 def get_subfolder(category: str, file_path: Path) -> Optional[str]:
     """获取二级分类文件夹名称"""
-    if category not in FOLDER_MAPPING:
-        return None
-        
-    config = FOLDER_MAPPING[category]
-    if "subfolders" not in config:
-        return None
-        
-    extension = file_path.suffix.lower()
-    for subfolder, extensions in config["subfolders"].items():
-        if not extensions or extension in extensions:
-            return subfolder
-            
-    return None
-
-def check_disk_space(path: Path) -> bool:
-    """检查磁盘空间是否足够"""
+    return get_classifier().subfolder(category, file_path)
+
+# 全局磁盘剩余空间缓存
+disk_space = FreeSpaceTracker(
+    MIN_FREE_SPACE_GB * 1024 * 1024 * 1024,
+    refresh_interval=DISK_SPACE_REFRESH_INTERVAL
+)
+
+def check_disk_space(path: Path, nbytes: int = 0) -> bool:
+    """检查磁盘空间是否足够（使用按磁盘缓存的剩余空间）"""
+    return disk_space.has_room(path, nbytes)
+
+# 文件移动方式
+MOVE_RENAME = "rename"      # 同一磁盘内原子重命名，无需备份
+MOVE_HARDLINK = "hardlink"  # 硬链接备份后跨磁盘移动
+MOVE_COPY = "copy"          # 完整复制备份后移动
+MOVE_DIRECT = "direct"      # 不备份直接移动
+
+class MoveReport(NamedTuple):
+    """单次文件移动的结果"""
+    source: Path
+    dest: Optional[Path]
+    method: Optional[str]
+    bytes_copied: int
+
+def is_same_volume(path_a: Path, path_b: Path) -> bool:
+    """判断两个路径是否在同一文件系统上"""
     try:
-        # 将Path对象转换为字符串
-        path_str = str(path)
-        free_space = psutil.disk_usage(path_str).free
-        return free_space > MIN_FREE_SPACE_GB * 1024 * 1024 * 1024
-    except Exception as e:
-        logging.error(f"检查磁盘空间时出错: {e}")
+        return os.stat(path_a).st_dev == os.stat(path_b).st_dev
+    except OSError:
         return False
 
-def create_backup(file_path: Path) -> Tuple[bool, Optional[Path]]:
-    """创建文件备份"""
+def select_backup_method(same_volume: bool) -> str:
+    """根据 MOVE_BACKUP_MODE 和源/目标是否在同一磁盘选择移动方式"""
+    if MOVE_BACKUP_MODE == "none":
+        return MOVE_DIRECT
+    if MOVE_BACKUP_MODE == "copy":
+        return MOVE_COPY
+    # 同一磁盘内的重命名是原子操作，失败时源文件保持不变
+    if same_volume:
+        return MOVE_RENAME
+    return MOVE_HARDLINK
+
+def create_backup(file_path: Path, hardlink: bool = False) -> Tuple[bool, Optional[Path], int]:
+    """创建文件备份
+    参数:
+        hardlink: 优先使用硬链接备份（不复制数据），不支持时回退为完整复制
+    返回: (是否成功, 备份路径, 复制的字节数)"""
     try:
         backup_dir = BACKUP_PATH / datetime.now().strftime("%Y%m%d")
         backup_dir.mkdir(parents=True, exist_ok=True)
@@ -129,34 +280,41 @@ def create_backup(file_path: Path) -> Tuple[bool, Optional[Path]]:
         if backup_path.exists():
             backup_path = backup_dir / f"{file_path.stem}_{int(time.time())}{file_path.suffix}"
         
+        if hardlink:
+            try:
+                os.link(file_path, backup_path)
+                logging.info(f"已备份文件(硬链接): {file_path} -> {backup_path}")
+                return True, backup_path, 0
+            except OSError as e:
+                logging.debug(f"无法创建硬链接，改为复制备份 {file_path}: {e}")
+
         shutil.copy2(file_path, backup_path)
         logging.info(f"已备份文件: {file_path} -> {backup_path}")
-        return True, backup_path
+        return True, backup_path, backup_path.stat().st_size
     except Exception as e:
         logging.error(f"备份文件失败 {file_path}: {e}")
-        return False, None
-
-def safe_move_file(file_path: Path, dest_folder: Path) -> int:
-    """安全地移动文件"""
+        return False, None, 0
+
+def safe_move_file(file_path: Path, dest_folder: Path) -> Tuple[int, MoveReport]:
+    """安全地移动文件
+    返回: (状态码, 移动结果)"""
+    backup_path = None
+    reserved = 0
+    moved = False
+    report = MoveReport(file_path, None, None, 0)
     try:
         if not check_disk_space(dest_folder):
-            return Status.INSUFFICIENT_SPACE
+            return Status.INSUFFICIENT_SPACE, report
 
         if is_file_in_use(file_path):
-            return Status.FILE_IN_USE
-
-        # 创建备份
-        success, backup_path = create_backup(file_path)
-        if not success:
-            return Status.BACKUP_FAILED
+            return Status.FILE_IN_USE, report
 
-        # 获取文件分类
-        category = get_file_category(file_path)
+        # 获取文件分类及二级分类（一次查找）
+        category, subfolder = get_classifier().classify(file_path)
         if not category:
-            return Status.INVALID_PATH
+            return Status.INVALID_PATH, report
             
         # 检查是否需要二级分类
-        subfolder = get_subfolder(category, file_path)
         if subfolder:
             dest_folder = dest_folder / subfolder
             
@@ -167,82 +325,238 @@ def safe_move_file(file_path: Path, dest_folder: Path) -> int:
         if dest_path.exists():
             dest_path = dest_folder / f"{file_path.stem}_{int(time.time())}{file_path.suffix}"
 
+        # 选择备份策略
+        same_volume = is_same_volume(file_path, dest_folder)
+        method = select_backup_method(same_volume)
+
+        # 跨磁盘移动为文件数据预留目标磁盘空间
+        if not same_volume:
+            size = file_path.stat().st_size
+            if not disk_space.reserve(dest_folder, size):
+                return Status.INSUFFICIENT_SPACE, report
+            reserved = size
+
+        bytes_copied = 0
+        if method in (MOVE_HARDLINK, MOVE_COPY):
+            success, backup_path, bytes_copied = create_backup(
+                file_path, hardlink=(method == MOVE_HARDLINK)
+            )
+            if not success:
+                return Status.BACKUP_FAILED, report
+            if method == MOVE_HARDLINK and bytes_copied:
+                method = MOVE_COPY
+
         # 移动文件
-        shutil.move(str(file_path), str(dest_path))
-        logging.info(f"已移动文件: {file_path} -> {dest_path}")
+        if method == MOVE_RENAME:
+            os.rename(file_path, dest_path)
+        else:
+            size = file_path.stat().st_size
+            shutil.move(str(file_path), str(dest_path))
+            # 跨磁盘移动需要复制全部数据
+            if not same_volume:
+                bytes_copied += size
+        moved = True
+        file_stats.remove(file_path)
+        in_use_detector.forget(file_path)
+        report = MoveReport(file_path, dest_path, method, bytes_copied)
+        logging.info(f"已移动文件: {file_path} -> {dest_path} (方式: {method}, 复制 {bytes_copied} 字节)")
         
         # 移动成功后删除备份
         if backup_path and backup_path.exists():
             backup_path.unlink()
             logging.debug(f"已删除备份文件: {backup_path}")
             
-        return Status.SUCCESS
+        return Status.SUCCESS, report
 
     except Exception as e:
         logging.error(f"移动文件失败 {file_path}: {e}")
-        # 移动失败时尝试从备份恢复
-        if backup_path and backup_path.exists():
+        # 移动失败且源文件已丢失时尝试从备份恢复
+        if backup_path and backup_path.exists() and not file_path.exists():
             try:
-                shutil.copy2(backup_path, file_path)
+                shutil.move(str(backup_path), str(file_path))
                 logging.info(f"已从备份恢复文件: {backup_path} -> {file_path}")
             except Exception as restore_error:
                 logging.error(f"恢复备份失败: {restore_error}")
-        return Status.MOVE_FAILED
+        return Status.MOVE_FAILED, report
+    finally:
+        if reserved:
+            disk_space.release(dest_folder, reserved, consumed=moved)
+
+
+UNCATEGORIZED = "未分类"
+
+class FileStatsCounter:
+    """下载文件夹文件统计
+
+    由文件监控和文件移动增量更新，读取统计只需 O(分类数)。
+    偶尔在后台线程中做一次全量扫描校准，扫描期间的增量更新会在校准后重放。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._files: Dict[str, str] = {}  # {文件路径: 分类}
+        self._counts = self._empty_counts()
+        self._pending_ops: Optional[List[Tuple[bool, str]]] = None  # 校准期间的增量更新
+        self.last_reconcile = 0.0
+
+    @staticmethod
+    def _empty_counts() -> Dict[str, int]:
+        counts = {category: 0 for category in FOLDER_MAPPING.keys()}
+        counts[UNCATEGORIZED] = 0
+        return counts
+
+    @staticmethod
+    def _category_of(path: str) -> str:
+        return get_classifier().classify_name(os.path.basename(path))[0] or UNCATEGORIZED
+
+    def _apply(self, files: Dict[str, str], counts: Dict[str, int], added: bool, path: str) -> None:
+        if added:
+            if path not in files:
+                category = self._category_of(path)
+                files[path] = category
+                counts[category] += 1
+        else:
+            category = files.pop(path, None)
+            if category is not None:
+                counts[category] -= 1
+
+    def add(self, file_path: Path) -> None:
+        """记录下载文件夹中新增的文件"""
+        self._update(True, str(file_path))
+
+    def remove(self, file_path: Path) -> None:
+        """记录离开下载文件夹的文件"""
+        self._update(False, str(file_path))
+
+    def _update(self, added: bool, path: str) -> None:
+        with self._lock:
+            self._apply(self._files, self._counts, added, path)
+            if self._pending_ops is not None:
+                self._pending_ops.append((added, path))
+
+    def snapshot(self) -> Dict[str, int]:
+        """返回各分类的文件数"""
+        with self._lock:
+            return dict(self._counts)
+
+    def needs_reconcile(self) -> bool:
+        """是否需要全量校准"""
+        return time.time() - self.last_reconcile > STATS_RECONCILE_INTERVAL
+
+    def reconcile(self) -> None:
+        """全量扫描下载文件夹，校准统计"""
+        with self._lock:
+            if self._pending_ops is not None:
+                return  # 已有校准在进行
+            self._pending_ops = []
+            self.last_reconcile = time.time()
+        files: Dict[str, str] = {}
+        counts = self._empty_counts()
+        try:
+            with os.scandir(DOWNLOADS_PATH) as entries:
+                for entry in entries:
+                    if entry.is_file():
+                        self._apply(files, counts, True, entry.path)
+        except Exception as e:
+            logging.error(f"获取文件统计信息时出错: {e}")
+            with self._lock:
+                self._pending_ops = None
+            return
+        with self._lock:
+            for added, path in self._pending_ops:
+                self._apply(files, counts, added, path)
+            self._files, self._counts = files, counts
+            self._pending_ops = None
+
+    def reconcile_in_background(self) -> None:
+        """在后台线程中校准统计"""
+        threading.Thread(target=self.reconcile, daemon=True).start()
 
 
+# 全局文件统计
+file_stats = FileStatsCounter()
+
 def get_file_stats() -> dict:
     """获取文件统计信息"""
-    stats = {category: 0 for category in FOLDER_MAPPING.keys()}
-    stats["未分类"] = 0
-    
-    try:
-        for file_path in DOWNLOADS_PATH.iterdir():
-            if file_path.is_file():
-                category = get_file_category(file_path)
-                if category:
-                    stats[category] += 1
-                else:
-                    stats["未分类"] += 1
-    except Exception as e:
-        logging.error(f"获取文件统计信息时出错: {e}")
-    
-    return stats
-
-def get_recent_logs(lines: int = 100) -> List[str]:
-    """获取最近的日志记录"""
-    try:
-        # 获取最新的日志文件
-        log_files = sorted(Path(LOGS_PATH).glob("organizer_*.log*"), reverse=True)
-        if not log_files:
+    if file_stats.needs_reconcile():
+        file_stats.reconcile_in_background()
+    return file_stats.snapshot()
+
+class LogTailer:
+    """日志文件尾部读取器
+
+    从文件末尾按块向前查找最后N行，当前文件行数不够时继续读取 RotatingFileHandler
+    轮转出的旧文件。读取的时间和内存只与所需行数有关，与日志文件大小无关。"""
+
+    def __init__(self, log_file: Optional[Path] = None, block_size: int = 8192):
+        self.log_file = Path(log_file) if log_file else self._find_log_file()
+        self.block_size = block_size
+
+    @staticmethod
+    def _find_log_file() -> Optional[Path]:
+        """查找当前日志文件"""
+        if current_log_file is not None:
+            return current_log_file
+        log_files = sorted(Path(LOGS_PATH).glob("organizer_*.log"))
+        return log_files[-1] if log_files else None
+
+    def _rotated(self, index: int) -> Path:
+        return self.log_file.with_name(f"{self.log_file.name}.{index}")
+
+    def _tail_file(self, path: Path, lines: int) -> List[bytes]:
+        """按块从文件末尾向前读取最后若干完整行"""
+        with open(path, "rb") as f:
+            pos = f.seek(0, os.SEEK_END)
+            data = b""
+            while pos > 0 and data.count(b"\n") <= lines:
+                size = min(self.block_size, pos)
+                pos -= size
+                f.seek(pos)
+                data = f.read(size) + data
+        result = data[:data.rfind(b"\n") + 1].splitlines(keepends=True)
+        # 起始位置不在文件开头时，第一段可能是不完整的行
+        if pos > 0 and result:
+            result = result[1:]
+        return result[-lines:] if lines > 0 else []
+
+    def tail(self, lines: int = 100) -> List[str]:
+        """返回最后N行日志（包括轮转的旧文件）"""
+        if self.log_file is None:
             return []
-            
-        recent_logs = []
-        remaining_lines = lines
-        
-        # 从最新的日志文件开始读取
-        for log_file in log_files:
-            if remaining_lines <= 0:
+        result: List[bytes] = []
+        try:
+            result = self._tail_file(self.log_file, lines)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logging.error(f"读取日志文件出错 {self.log_file}: {e}")
+            return []
+
+        # 当前文件行数不够时继续读取轮转的旧文件
+        for index in range(1, LOG_BACKUP_COUNT + 1):
+            if len(result) >= lines:
+                break
+            rotated = self._rotated(index)
+            if not rotated.exists():
                 break
-                
             try:
-                with open(log_file, 'r', encoding=LOG_ENCODING) as f:
-                    # 读取所有行并反转,这样可以从最新的开始
-                    file_lines = f.readlines()[::-1]
-                    # 取需要的行数
-                    recent_logs.extend(file_lines[:remaining_lines])
-                    remaining_lines -= len(file_lines)
+                result = self._tail_file(rotated, lines - len(result)) + result
             except Exception as e:
-                logging.error(f"读取日志文件出错 {log_file}: {e}")
-                
-        # 反转回正确的顺序并返回
-        return recent_logs[::-1]
-        
+                logging.error(f"读取日志文件出错 {rotated}: {e}")
+                break
+        return [line.decode(LOG_ENCODING, errors="replace") for line in result]
+
+def get_recent_logs(lines: int = 100) -> List[str]:
+    """获取最近的日志记录"""
+    try:
+        return LogTailer().tail(lines)
     except Exception as e:
         logging.error(f"获取最近日志时出错: {e}")
-        return [] 
+        return []
 
-def reorganize_temp_folder() -> None:
-    """重新整理[TEMP]待清理文件夹"""
+def reorganize_temp_folder(cancel_event: Optional[threading.Event] = None) -> None:
+    """重新整理[TEMP]待清理文件夹
+    参数:
+        cancel_event: 设置后停止整理（已整理的文件不受影响，下次可继续）"""
     try:
         temp_folder = DOWNLOADS_PATH / "[TEMP] 待清理"
         if not temp_folder.exists():
@@ -253,6 +567,9 @@ def reorganize_temp_folder() -> None:
         
         # 获取所有文件（包括子文件夹中的文件）
         for file_path in temp_folder.rglob("*"):
+            if cancel_event is not None and cancel_event.is_set():
+                logging.info("[TEMP]待清理文件夹整理已中断")
+                return
             if not file_path.is_file():
                 continue
                 
@@ -308,139 +625,256 @@ def clean_empty_folders(folder: Path) -> None:
     except Exception as e:
         logging.error(f"清理空文件夹时出错: {e}") 
 
-def check_cleanup_rules(file_path: Path) -> Tuple[bool, str]:
-    """检查文件是否符合清理规则
-    返回: (是否应该清理, 原因)"""
+class CleanupCandidate(NamedTuple):
+    """待清理的文件"""
+    path: Path
+    reason: str
+    size: int
+    mtime: float
+
+CANCEL_CHECK_INTERVAL = 256  # 遍历文件夹时每处理多少个条目检查一次是否已取消
+
+def _walk_files(folder: Path, cancelled: threading.Event) -> Iterator[os.DirEntry]:
+    """用 os.scandir 递归遍历文件夹中的文件
+    单个文件夹中的条目很多时也会定期检查取消标志，不必等到该文件夹遍历完"""
+    stack = [str(folder)]
+    count = 0
+    while stack and not cancelled.is_set():
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    count += 1
+                    if count % CANCEL_CHECK_INTERVAL == 0 and cancelled.is_set():
+                        return
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            yield entry
+                    except OSError:
+                        continue
+        except OSError as e:
+            logging.error(f"读取文件夹失败: {e}")
+
+def _scan_folder(folder_name: str, rules: CleanupRules, results: "queue.Queue",
+                 cancelled: threading.Event) -> None:
+    """扫描单个文件夹，把符合清理规则的文件放入结果队列"""
     try:
-        # 检查排除模式
-        for pattern in CLEANUP_CONFIG.get("exclude_patterns", []):
-            if fnmatch.fnmatch(file_path.name, pattern):
-                return False, "文件名匹配排除模式"
-        
-        # 检查文件年龄
-        if CLEANUP_CONFIG.get("rules", {}).get("age", {}).get("enabled", False):
-            days = CLEANUP_CONFIG["rules"]["age"].get("days", 30)
-            age = (datetime.now() - datetime.fromtimestamp(file_path.stat().st_mtime)).days
-            if age > days:
-                return True, f"文件超过{days}天未修改"
-        
-        # 检查文件大小
-        if CLEANUP_CONFIG.get("rules", {}).get("size", {}).get("enabled", False):
-            max_size = CLEANUP_CONFIG["rules"]["size"].get("max_size_mb", 1024)  # 默认1GB
-            size_mb = file_path.stat().st_size / (1024 * 1024)
-            if size_mb > max_size:
-                return True, f"文件大小超过{max_size}MB"
-        
-        # 检查文件类型
-        if CLEANUP_CONFIG.get("rules", {}).get("type", {}).get("enabled", False):
-            extensions = CLEANUP_CONFIG["rules"]["type"].get("extensions", [])
-            if file_path.suffix.lower() in extensions:
-                return True, f"文件类型{file_path.suffix}在清理列表中"
-        
-        return False, "文件不符合清理规则"
-        
-    except Exception as e:
-        logging.error(f"检查清理规则时出错 {file_path}: {str(e)}")
-        return False, f"检查规则出错: {str(e)}"
+        folder_path = DOWNLOADS_PATH / folder_name
+        if not folder_path.exists():
+            logging.info(f"跳过不存在的文件夹: {folder_name}")
+            return
 
-def scan_files_for_cleanup() -> List[Tuple[Path, str]]:
-    """扫描需要清理的文件
-    返回: [(文件路径, 清理原因)]"""
-    cleanup_files = []
-    try:
-        logging.info("开始扫描需要清理的文件...")
-        # 只扫描启用的文件夹
-        for folder_name in CLEANUP_CONFIG["enabled_folders"]:
-            folder_path = DOWNLOADS_PATH / folder_name
-            if not folder_path.exists():
-                logging.info(f"跳过不存在的文件夹: {folder_name}")
+        logging.info(f"正在扫描文件夹: {folder_name}")
+        for entry in _walk_files(folder_path, cancelled):
+            try:
+                stat_result = entry.stat()
+            except OSError:
                 continue
+            reason = rules.evaluate(entry.name, stat_result.st_size, stat_result.st_mtime)
+            if reason is not None:
+                results.put(CleanupCandidate(Path(entry.path), reason, stat_result.st_size, stat_result.st_mtime))
+    except Exception as e:
+        logging.error(f"扫描清理文件时出错 {folder_name}: {e}")
+    finally:
+        results.put(None)  # 该文件夹扫描结束
+
+def iter_cleanup_candidates(cancel_event: Optional[threading.Event] = None) -> Iterator[CleanupCandidate]:
+    """并行扫描启用的文件夹，边扫描边返回需要清理的文件
+    提前停止迭代或设置 cancel_event 时会通知扫描线程退出"""
+    folders = list(CLEANUP_CONFIG["enabled_folders"])
+    if not folders:
+        return
+
+    logging.info("开始扫描需要清理的文件...")
+    results: "queue.Queue" = queue.Queue()
+    cancelled = threading.Event()
+    workers = max(1, min(len(folders), CLEANUP_CONFIG.get("scan_workers", 4)))
+    executor = ThreadPoolExecutor(max_workers=workers)
+    count = 0
+    # 清理规则在每次扫描开始时编译一次
+    rules = CleanupRules()
+    try:
+        for folder_name in folders:
+            executor.submit(_scan_folder, folder_name, rules, results, cancelled)
 
-            logging.info(f"正在扫描文件夹: {folder_name}")
-            # 扫描文件夹中的所有文件
-            for file_path in folder_path.rglob("*"):
-                if not file_path.is_file():
-                    continue
+        remaining = len(folders)
+        while remaining:
+            try:
+                candidate = results.get(timeout=0.2)
+            except queue.Empty:
+                candidate = False
+            if cancel_event is not None and cancel_event.is_set():
+                logging.info("扫描已取消")
+                return
+            if candidate is False:
+                continue
+            if candidate is None:
+                remaining -= 1
+                continue
+            count += 1
+            logging.info(f"找到需要清理的文件: {candidate.path} (原因: {candidate.reason})")
+            yield candidate
+
+        logging.info(f"扫描完成，共找到 {count} 个需要清理的文件")
+    finally:
+        cancelled.set()
+        executor.shutdown(wait=False)
+
+# 清理结果状态
+CLEANUP_SUCCESS = "success"
+CLEANUP_FAILED = "failed"
+CLEANUP_SKIPPED = "skipped"
+
+class CleanupResult(NamedTuple):
+    """单个文件的清理结果"""
+    path: Path
+    reason: str
+    status: str
+    message: str
+
+class CleanupReport:
+    """清理结果报告"""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.results: List[CleanupResult] = []
+        self.cancelled = False
+
+    def add(self, path: Path, reason: str, status: str, message: str = "") -> None:
+        self.results.append(CleanupResult(path, reason, status, message))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """按状态统计"""
+        stats = {"total": self.total, CLEANUP_SUCCESS: 0, CLEANUP_FAILED: 0, CLEANUP_SKIPPED: 0}
+        for result in self.results:
+            stats[result.status] += 1
+        return stats
 
-                should_cleanup, reason = check_cleanup_rules(file_path)
-                if should_cleanup:
-                    cleanup_files.append((file_path, reason))
-                    logging.info(f"找到需要清理的文件: {file_path} (原因: {reason})")
+class _ProgressThrottle:
+    """限制进度回调频率，避免每个文件都刷新界面"""
 
-        logging.info(f"扫描完成，共找到 {len(cleanup_files)} 个需要清理的文件")
+    def __init__(self, callback, total: int, interval: float):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+        self._last = 0.0
 
-    except Exception as e:
-        logging.error(f"扫描清理文件时出错: {e}")
+    def __call__(self, current: int, file_path: Path, reason: str, force: bool = False) -> None:
+        if not self.callback:
+            return
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.callback(current, self.total, file_path, reason)
 
-    return cleanup_files
+def _precheck_cleanup(file_path: Path, busy: set) -> Optional[str]:
+    """删除前检查，返回跳过原因，可以删除时返回None
+    参数:
+        busy: files_in_use 对整批文件的检测结果"""
+    if not file_path.exists():
+        return "文件不存在"
+    if file_path in busy:
+        return "文件被占用"
+    return None
 
-def cleanup_files(files: List[Tuple[Path, str]], callback=None) -> Dict[str, int]:
-    """清理文件
+def _delete_one(file_path: Path) -> Optional[str]:
+    """删除单个文件，返回错误信息，成功时返回None"""
+    try:
+        if CLEANUP_CONFIG["safe_mode"]:
+            from send2trash import send2trash
+            send2trash(str(file_path))
+        else:
+            file_path.unlink()
+        in_use_detector.forget(file_path)
+        return None
+    except Exception as e:
+        # 批量操作失败后逐个重试时，文件可能已在批量操作中被移走
+        if not file_path.exists():
+            return None
+        return str(e)
+
+def _delete_batch(batch: List[Tuple[Path, str]], pool: ThreadPoolExecutor) -> List[Optional[str]]:
+    """删除一批文件，返回每个文件的错误信息"""
+    if CLEANUP_CONFIG["safe_mode"]:
+        try:
+            # send2trash 支持一次移动多个文件（只在清理时才导入）
+            from send2trash import send2trash
+            send2trash([str(file_path) for file_path, _ in batch])
+            for file_path, _ in batch:
+                in_use_detector.forget(file_path)
+            return [None] * len(batch)
+        except Exception as e:
+            logging.warning(f"批量移动到回收站失败，改为逐个处理: {e}")
+    return list(pool.map(_delete_one, [file_path for file_path, _ in batch]))
+
+def run_cleanup(files: List[Tuple[Path, str]], callback=None,
+                cancel_event: Optional[threading.Event] = None) -> CleanupReport:
+    """批量清理文件
     参数:
-        files: 要清理的文件列表
-        callback: 进度回调函数
-    返回: 清理结果统计"""
-    stats = {
-        "total": len(files),
-        "success": 0,
-        "failed": 0,
-        "skipped": 0
-    }
+        files: 要清理的文件列表 [(文件路径, 清理原因)]
+        callback: 进度回调函数 callback(当前, 总数, 文件路径, 原因)，调用频率受 progress_interval 限制
+        cancel_event: 设置后在当前批次结束时停止，剩余文件记为跳过
+    返回: 每个文件的清理结果"""
+    report = CleanupReport(len(files))
 
     if not files:
         logging.info("没有需要清理的文件")
-        return stats
+        return report
 
     try:
         logging.info(f"开始清理文件，共 {len(files)} 个文件")
-        
-        # 记录是否有回调函数
-        logging.info(f"回调函数状态: {'已设置' if callback else '未设置'}")
         logging.info(f"是否需要确认: {CLEANUP_CONFIG['require_confirmation']}")
         
         # 如果需要确认且没有回调函数，直接返回
         if CLEANUP_CONFIG["require_confirmation"] and not callback:
             logging.info("需要用户确认但没有回调函数，跳过清理")
-            stats["skipped"] = len(files)
-            return stats
-
-        for i, (file_path, reason) in enumerate(files, 1):
-            try:
-                # 更新进度
-                if callback:
-                    callback(i, len(files), file_path, reason)
-                logging.info(f"正在处理第 {i}/{len(files)} 个文件: {file_path}")
-
-                # 如果文件不存在，跳过
-                if not file_path.exists():
-                    logging.info(f"文件不存在，跳过: {file_path}")
-                    stats["skipped"] += 1
-                    continue
-
-                # 如果文件被占用，跳过
-                if is_file_in_use(file_path):
-                    logging.info(f"文件被占用，跳过: {file_path}")
-                    stats["skipped"] += 1
-                    continue
-
-                # 删除文件
-                try:
-                    if CLEANUP_CONFIG["safe_mode"]:
-                        logging.info(f"移动到回收站: {file_path}")
-                        send2trash.send2trash(str(file_path))
+            for file_path, reason in files:
+                report.add(file_path, reason, CLEANUP_SKIPPED, "未确认")
+            return report
+
+        batch_size = max(1, CLEANUP_CONFIG.get("delete_batch_size", 100))
+        progress = _ProgressThrottle(callback, len(files), CLEANUP_CONFIG.get("progress_interval", 0.25))
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=CLEANUP_CONFIG.get("delete_workers", 4)) as pool:
+            for start in range(0, len(files), batch_size):
+                if cancel_event is not None and cancel_event.is_set():
+                    report.cancelled = True
+                    for file_path, reason in files[start:]:
+                        report.add(file_path, reason, CLEANUP_SKIPPED, "已取消")
+                    logging.info("清理已取消")
+                    break
+
+                batch = files[start:start + batch_size]
+
+                # 整批检测占用，并发检查文件是否存在
+                paths = [f for f, _ in batch]
+                busy = files_in_use(paths)
+                ready = []
+                for (file_path, reason), skip in zip(batch, pool.map(_precheck_cleanup, paths, [busy] * len(paths))):
+                    if skip:
+                        logging.info(f"{skip}，跳过: {file_path}")
+                        report.add(file_path, reason, CLEANUP_SKIPPED, skip)
                     else:
-                        logging.info(f"直接删除文件: {file_path}")
-                        file_path.unlink()
+                        ready.append((file_path, reason))
 
-                    stats["success"] += 1
-                    logging.info(f"已清理文件: {file_path} (原因: {reason})")
-                except Exception as e:
-                    logging.error(f"删除文件失败 {file_path}: {e}")
-                    stats["failed"] += 1
+                # 删除
+                if ready:
+                    for (file_path, reason), error in zip(ready, _delete_batch(ready, pool)):
+                        if error is None:
+                            logging.info(f"已清理文件: {file_path} (原因: {reason})")
+                            report.add(file_path, reason, CLEANUP_SUCCESS)
+                        else:
+                            logging.error(f"删除文件失败 {file_path}: {error}")
+                            report.add(file_path, reason, CLEANUP_FAILED, error)
 
-            except Exception as e:
-                logging.error(f"处理文件失败 {file_path}: {e}")
-                stats["failed"] += 1
+                done += len(batch)
+                progress(done, *batch[-1])
+
+            if not report.cancelled:
+                progress(done, *files[-1], force=True)
 
         # 如果需要清理空文件夹
         if CLEANUP_CONFIG["cleanup_empty_folders"]:
@@ -450,9 +884,10 @@ def cleanup_files(files: List[Tuple[Path, str]], callback=None) -> Dict[str, int
                 if folder_path.exists():
                     clean_empty_folders(folder_path)
 
+        stats = report.stats
         logging.info(f"清理完成。成功: {stats['success']}, 失败: {stats['failed']}, 跳过: {stats['skipped']}")
 
     except Exception as e:
         logging.error(f"清理文件时出错: {e}")
 
-    return stats 
\ No newline at end of file
+    return report
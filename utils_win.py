@@ -3,11 +3,13 @@ import sys
 import winreg
 import logging
 from pathlib import Path
-from win11toast import toast
 
 def show_welcome_notification(on_click_callback=None, title=None, message=None, sound=None):
     """显示通知"""
     try:
+        # 通知库较重，只在需要显示通知时导入
+        from win11toast import toast
+
         def callback(args):
             if on_click_callback:
                 on_click_callback()